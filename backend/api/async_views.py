@@ -0,0 +1,194 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+from django.shortcuts import aget_object_or_404
+from django.urls import path
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import (APIException, NotAuthenticated,
+                                       NotFound, ValidationError)
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from api.cache import (INGREDIENT_CACHE_VERSION_KEY, TAG_CACHE_VERSION_KEY,
+                       acached_response, aget_tag_ids_by_slug)
+from api.constants import MAX_INGREDIENTS_LIMIT
+from api.filters import RecipeFilter
+from api.pagination import AsyncPagination
+from api.search import ingredient_index
+from api.serializers import (IngredientSerializer, RecipeRetrieveSerializer,
+                             SubscriptionRetrieveSerializer, TagSerializer)
+from api.validators import validate_limit
+from api.views import (IngredientViewSet, RecipeViewSet, TagViewSet,
+                       UserViewSet, get_recipes_limit)
+from recipes.models import Ingredient, Recipe, Tag
+from users.models import CustomUser
+
+ASYNC_METHODS = ('GET', 'HEAD')
+
+
+def render(data, status_code=status.HTTP_200_OK, headers=None):
+    return HttpResponse(
+        JSONRenderer().render(data),
+        status=status_code,
+        content_type='application/json',
+        headers=headers
+    )
+
+
+def render_error(request, exc):
+    headers = None
+    if (exc.status_code == status.HTTP_401_UNAUTHORIZED
+            and request.authenticators):
+        headers = {
+            'WWW-Authenticate':
+                request.authenticators[0].authenticate_header(request)
+        }
+    data = (
+        exc.detail if isinstance(exc.detail, (list, dict))
+        else {'detail': exc.detail}
+    )
+    return render(data, exc.status_code, headers)
+
+
+def async_read_view(sync_view):
+    sync_view = sync_to_async(sync_view)
+
+    def decorator(async_view):
+
+        @csrf_exempt
+        @wraps(async_view)
+        async def view(request, *args, **kwargs):
+            if (request.method not in ASYNC_METHODS
+                    or request.GET.get('pagination') == 'cursor'):
+                return await sync_view(request, *args, **kwargs)
+            request = Request(request, authenticators=[
+                authentication_class()
+                for authentication_class
+                in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+            ])
+            try:
+                await sync_to_async(getattr)(request, 'user')
+                return await async_view(request, *args, **kwargs)
+            except Http404 as exc:
+                return render_error(request, NotFound(*exc.args))
+            except APIException as exc:
+                return render_error(request, exc)
+
+        return view
+
+    return decorator
+
+
+@async_read_view(RecipeViewSet.as_view({'get': 'list', 'post': 'create'}))
+async def recipe_list(request):
+    filterset = RecipeFilter(
+        data=request.query_params,
+        queryset=Recipe.objects.with_user_flags(request.user),
+        request=request,
+        tag_ids_by_slug=await aget_tag_ids_by_slug()
+    )
+    if not filterset.is_valid():
+        raise ValidationError(filterset.errors)
+    paginator = AsyncPagination()
+    recipes = await paginator.apaginate_queryset(filterset.qs, request)
+    serializer = RecipeRetrieveSerializer(
+        recipes, many=True, context={'request': request}
+    )
+    return render(paginator.get_paginated_response(serializer.data).data)
+
+
+@async_read_view(RecipeViewSet.as_view({
+    'get': 'retrieve',
+    'put': 'update',
+    'patch': 'partial_update',
+    'delete': 'destroy'
+}))
+async def recipe_detail(request, pk):
+    recipe = await aget_object_or_404(
+        Recipe.objects.with_user_flags(request.user), pk=pk
+    )
+    return render(
+        RecipeRetrieveSerializer(recipe, context={'request': request}).data
+    )
+
+
+@async_read_view(TagViewSet.as_view({'get': 'list'}))
+async def tag_list(request):
+    async def get_data():
+        return TagSerializer(
+            [tag async for tag in Tag.objects.all()], many=True
+        ).data
+
+    return await acached_response(request, TAG_CACHE_VERSION_KEY, get_data)
+
+
+@async_read_view(TagViewSet.as_view({'get': 'retrieve'}))
+async def tag_detail(request, pk):
+    async def get_data():
+        return TagSerializer(await aget_object_or_404(Tag, pk=pk)).data
+
+    return await acached_response(request, TAG_CACHE_VERSION_KEY, get_data)
+
+
+@async_read_view(IngredientViewSet.as_view({'get': 'list'}))
+async def ingredient_list(request):
+    async def get_data():
+        limit = validate_limit(
+            request.query_params.get('limit'),
+            MAX_INGREDIENTS_LIMIT,
+            (f'limit должен быть целым числом от 0 '
+             f'(не больше {MAX_INGREDIENTS_LIMIT})!')
+        )
+        name = request.query_params.get('name')
+        if name:
+            return await ingredient_index.asearch(name, limit)
+        return await ingredient_index.aall(limit)
+
+    return await acached_response(
+        request, INGREDIENT_CACHE_VERSION_KEY, get_data
+    )
+
+
+@async_read_view(IngredientViewSet.as_view({'get': 'retrieve'}))
+async def ingredient_detail(request, pk):
+    async def get_data():
+        return IngredientSerializer(
+            await aget_object_or_404(Ingredient, pk=pk)
+        ).data
+
+    return await acached_response(
+        request, INGREDIENT_CACHE_VERSION_KEY, get_data
+    )
+
+
+@async_read_view(UserViewSet.as_view({'get': 'subscriptions'}))
+async def subscriptions(request):
+    if not request.user.is_authenticated:
+        raise NotAuthenticated
+    paginator = AsyncPagination()
+    authors = await paginator.apaginate_queryset(
+        CustomUser.objects.subscriptions(
+            user=request.user,
+            recipes_limit=get_recipes_limit(request)
+        ),
+        request
+    )
+    serializer = SubscriptionRetrieveSerializer(
+        authors, many=True, context={'request': request}
+    )
+    return render(paginator.get_paginated_response(serializer.data).data)
+
+
+urlpatterns = [
+    path('users/subscriptions/', subscriptions, name='users-subscriptions'),
+    path('tags/', tag_list, name='tags-list'),
+    path('tags/<int:pk>/', tag_detail, name='tags-detail'),
+    path('ingredients/', ingredient_list, name='ingredients-list'),
+    path('ingredients/<int:pk>/', ingredient_detail,
+         name='ingredients-detail'),
+    path('recipes/', recipe_list, name='recipes-list'),
+    path('recipes/<int:pk>/', recipe_detail, name='recipes-detail'),
+]
@@ -0,0 +1,167 @@
+import time
+from hashlib import sha1
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
+
+from api.constants import RESPONSE_CACHE_TIMEOUT
+from recipes.models import Tag
+
+TAG_CACHE_VERSION_KEY = 'tag_cache_version'
+
+INGREDIENT_CACHE_VERSION_KEY = 'ingredient_cache_version'
+
+RECIPE_CACHE_VERSION_KEY = 'recipe_cache_version:{}'
+
+USER_CACHE_VERSION_KEY = 'user_cache_version:{}'
+
+TAG_IDS_CACHE_KEY = 'tag_ids:{}'
+
+
+def get_cache_version(key: str) -> int:
+    return cache.get_or_set(
+        key, time.time_ns(), settings.CACHE_VERSION_TIMEOUT
+    )
+
+
+def get_cache_versions(keys) -> dict:
+    versions = cache.get_many(keys)
+    missing_versions = {
+        key: time.time_ns() for key in keys if key not in versions
+    }
+    if missing_versions:
+        cache.set_many(missing_versions, settings.CACHE_VERSION_TIMEOUT)
+    return {**versions, **missing_versions}
+
+
+def bump_cache_version(key: str):
+    cache.set(key, time.time_ns(), settings.CACHE_VERSION_TIMEOUT)
+
+
+def get_tag_ids_by_slug() -> dict:
+    version = get_cache_version(TAG_CACHE_VERSION_KEY)
+    return cache.get_or_set(
+        TAG_IDS_CACHE_KEY.format(version),
+        lambda: dict(Tag.objects.values_list('slug', 'id')),
+        RESPONSE_CACHE_TIMEOUT
+    )
+
+
+def get_recipe_fragments(recipes, serialize) -> dict:
+    version_keys = {
+        recipe.pk: (
+            RECIPE_CACHE_VERSION_KEY.format(recipe.pk),
+            USER_CACHE_VERSION_KEY.format(recipe.author_id),
+            TAG_CACHE_VERSION_KEY,
+            INGREDIENT_CACHE_VERSION_KEY
+        )
+        for recipe in recipes
+    }
+    versions = get_cache_versions({
+        key for keys in version_keys.values() for key in keys
+    })
+    fragment_keys = {
+        pk: 'recipe:{}:{}'.format(
+            pk, ':'.join(str(versions.get(key)) for key in keys)
+        )
+        for pk, keys in version_keys.items()
+    }
+    cached_fragments = cache.get_many(fragment_keys.values())
+    fragments = {}
+    missing_fragments = {}
+    for recipe in recipes:
+        key = fragment_keys.get(recipe.pk)
+        if key in cached_fragments:
+            fragments[recipe.pk] = cached_fragments.get(key)
+        else:
+            fragments[recipe.pk] = missing_fragments[key] = serialize(recipe)
+    if missing_fragments:
+        cache.set_many(missing_fragments, RESPONSE_CACHE_TIMEOUT)
+    return fragments
+
+
+def get_response_cache_key(request, cache_version_key, version) -> str:
+    return f'{cache_version_key}:{version}:{request.get_full_path()}'
+
+
+def render_cache_entry(data) -> tuple:
+    content = JSONRenderer().render(data)
+    return content, f'"{sha1(content).hexdigest()}"'
+
+
+def get_conditional_cached_response(request, entry, version):
+    content, etag = entry
+    last_modified = version // 10 ** 9
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = HttpResponse(content, content_type='application/json')
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+async def aget_cache_version(key: str) -> int:
+    return await cache.aget_or_set(
+        key, time.time_ns(), settings.CACHE_VERSION_TIMEOUT
+    )
+
+
+async def aget_tag_ids_by_slug() -> dict:
+    version = await aget_cache_version(TAG_CACHE_VERSION_KEY)
+    key = TAG_IDS_CACHE_KEY.format(version)
+    tag_ids = await cache.aget(key)
+    if tag_ids is None:
+        tag_ids = {
+            slug: pk
+            async for slug, pk in Tag.objects.values_list('slug', 'id')
+        }
+        await cache.aset(key, tag_ids, RESPONSE_CACHE_TIMEOUT)
+    return tag_ids
+
+
+async def acached_response(request, cache_version_key, get_data):
+    version = await aget_cache_version(cache_version_key)
+    key = get_response_cache_key(request, cache_version_key, version)
+    entry = await cache.aget(key)
+    if entry is None:
+        entry = render_cache_entry(await get_data())
+        await cache.aset(key, entry, RESPONSE_CACHE_TIMEOUT)
+    return get_conditional_cached_response(request, entry, version)
+
+
+class CachedResponseMixin:
+    cache_version_key = None
+
+    def cached_response(self, request, get_response):
+        version = get_cache_version(self.cache_version_key)
+        key = get_response_cache_key(
+            request, self.cache_version_key, version
+        )
+        entry = cache.get(key)
+        if entry is None:
+            response = get_response()
+            if response.status_code != 200:
+                return response
+            entry = render_cache_entry(response.data)
+            cache.set(key, entry, RESPONSE_CACHE_TIMEOUT)
+        return get_conditional_cached_response(request, entry, version)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, lambda: super(CachedResponseMixin, self).list(
+                request, *args, **kwargs
+            )
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, lambda: super(CachedResponseMixin, self).retrieve(
+                request, *args, **kwargs
+            )
+        )
@@ -0,0 +1,20 @@
+SHOPPING_LIST_CHUNK_SIZE = 2000
+
+MAX_RECIPES_LIMIT = 100
+
+MAX_INGREDIENTS_LIMIT = 1000
+
+INGREDIENT_SEARCH_GRAM_SIZE = 3
+
+RESPONSE_CACHE_TIMEOUT = 60 * 60 * 24
+
+TAGS_MATCH_ANY = 'any'
+
+TAGS_MATCH_ALL = 'all'
+
+TAGS_MATCH_CHOICES = (
+    (TAGS_MATCH_ANY, 'Любой из тэгов'),
+    (TAGS_MATCH_ALL, 'Все тэги')
+)
+
+REPLICA_PIN_COOKIE = 'db_primary_pin'
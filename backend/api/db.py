@@ -0,0 +1,32 @@
+from django.db import connections
+
+POOL_METRICS = (
+    'pool_size', 'pool_available', 'requests_waiting', 'requests_num',
+    'requests_wait_ms', 'requests_errors', 'connections_num',
+    'connections_errors', 'connections_lost',
+)
+
+
+def get_pools():
+    return {
+        connection.alias: connection.pool
+        for connection in connections.all()
+        if getattr(connection, 'pool', None) is not None
+    }
+
+
+def get_pool_stats() -> dict:
+    return {
+        alias: {
+            metric: value for metric, value in pool.get_stats().items()
+            if metric in POOL_METRICS
+        }
+        for alias, pool in get_pools().items()
+    }
+
+
+def close_pools():
+    connections.close_all()
+    for connection in connections.all():
+        if getattr(connection, 'pool', None) is not None:
+            connection.close_pool()
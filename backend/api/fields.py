@@ -0,0 +1,61 @@
+import base64
+import binascii
+import io
+from pathlib import PurePath
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from drf_extra_fields.fields import Base64ImageField
+from PIL import Image
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+IMAGE_HEADER_LENGTH = 256 * 1024
+
+
+def validate_image_size(size: int):
+    if size > settings.IMAGE_MAX_UPLOAD_SIZE:
+        raise ValidationError(
+            detail=(f'Размер изображения не может превышать '
+                    f'{settings.IMAGE_MAX_UPLOAD_SIZE // 1024 ** 2} МБ!'),
+            code=400
+        )
+
+
+def validate_image_pixels(header: bytes):
+    try:
+        with Image.open(io.BytesIO(header)) as image:
+            width, height = image.size
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return
+    if width * height > settings.IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            detail=(f'Изображение не может содержать больше '
+                    f'{settings.IMAGE_MAX_PIXELS} пикселей!'),
+            code=400
+        )
+
+
+class RecipeImageField(Base64ImageField):
+
+    def to_internal_value(self, base64_data):
+        if isinstance(base64_data, UploadedFile):
+            validate_image_size(base64_data.size)
+            validate_image_pixels(base64_data.read(IMAGE_HEADER_LENGTH))
+            base64_data.seek(0)
+            base64_data.name = (self.get_file_name(base64_data)
+                                + PurePath(base64_data.name).suffix.lower())
+            return serializers.ImageField.to_internal_value(
+                self, base64_data
+            )
+        if isinstance(base64_data, str):
+            encoded = base64_data.split(';base64,')[-1]
+            validate_image_size(len(encoded) * 3 // 4)
+            try:
+                header = base64.b64decode(
+                    encoded[:IMAGE_HEADER_LENGTH // 3 * 4]
+                )
+            except (binascii.Error, ValueError):
+                header = b''
+            validate_image_pixels(header)
+        return super().to_internal_value(base64_data)
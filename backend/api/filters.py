@@ -1,25 +1,76 @@
+from django import forms
+from django.db.models import Count, Exists, OuterRef
 from django_filters.rest_framework import (BooleanFilter, CharFilter,
-                                           FilterSet,
-                                           ModelMultipleChoiceFilter)
-from rest_framework.filters import SearchFilter
+                                           ChoiceFilter, Filter, FilterSet)
+from django_filters.widgets import QueryArrayWidget
 
-from recipes.models import Recipe, Tag
+from api.cache import get_tag_ids_by_slug
+from api.constants import TAGS_MATCH_ALL, TAGS_MATCH_ANY, TAGS_MATCH_CHOICES
+from recipes.models import Recipe, RecipeTag
 
 
-class IngredientFilter(SearchFilter):
-    search_param = 'name'
+class SlugListField(forms.Field):
+    widget = QueryArrayWidget
+
+    def to_python(self, value):
+        return [
+            slug.strip()
+            for item in value or ()
+            for slug in item.split(',')
+            if slug.strip()
+        ]
+
+
+class SlugListFilter(Filter):
+    field_class = SlugListField
 
 
 class RecipeFilter(FilterSet):
     author = CharFilter()
-    tags = ModelMultipleChoiceFilter(
-        field_name='tags__slug',
-        queryset=Tag.objects.all(),
-        label='Tags',
-        to_field_name='slug'
+    tags = SlugListFilter(method='get_tags', label='Tags')
+    match = ChoiceFilter(
+        choices=TAGS_MATCH_CHOICES,
+        method='get_match',
+        empty_label=None
     )
     is_favorited = BooleanFilter(method='get_is_favorite')
     is_in_shopping_cart = BooleanFilter(method='get_is_in_shopping_cart')
+    search = CharFilter(method='get_search')
+
+    def __init__(self, *args, tag_ids_by_slug=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tag_ids_by_slug = tag_ids_by_slug
+
+    def get_tags(self, queryset, name, value):
+        tag_ids_by_slug = (
+            self.tag_ids_by_slug if self.tag_ids_by_slug is not None
+            else get_tag_ids_by_slug()
+        )
+        tag_ids = {
+            tag_ids_by_slug[slug] for slug in value if slug in tag_ids_by_slug
+        }
+        match = self.form.cleaned_data.get('match') or TAGS_MATCH_ANY
+        if not tag_ids or (match == TAGS_MATCH_ALL
+                           and len(tag_ids) < len(set(value))):
+            return queryset.none()
+        if match == TAGS_MATCH_ANY or len(tag_ids) == 1:
+            return queryset.filter(
+                Exists(RecipeTag.objects.filter(
+                    recipe=OuterRef('pk'),
+                    tag_id__in=tag_ids
+                ))
+            )
+        return queryset.filter(
+            pk__in=RecipeTag.objects.filter(tag_id__in=tag_ids)
+            .order_by()
+            .values('recipe')
+            .annotate(tags_count=Count('tag', distinct=True))
+            .filter(tags_count=len(tag_ids))
+            .values('recipe')
+        )
+
+    def get_match(self, queryset, name, value):
+        return queryset
 
     def get_is_favorite(self, queryset, name, value):
         return (queryset.filter(favorites__user=self.request.user.id)
@@ -29,6 +80,10 @@ class RecipeFilter(FilterSet):
         return (queryset.filter(shopping_cart__user=self.request.user.id)
                 if value else queryset)
 
+    def get_search(self, queryset, name, value):
+        value = value.strip()
+        return queryset.search(value) if value else queryset
+
     class Meta:
         model = Recipe
         fields = (
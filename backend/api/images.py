@@ -0,0 +1,136 @@
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from pathlib import PurePosixPath
+
+import django
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection
+from PIL import Image, ImageOps, features
+
+from api.cache import RECIPE_CACHE_VERSION_KEY, bump_cache_version
+from recipes.models import Recipe
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+_executor_pid = None
+
+
+def get_image_format():
+    if settings.IMAGE_FORMAT == 'WEBP' and not features.check('webp'):
+        return 'JPEG'
+    return settings.IMAGE_FORMAT
+
+
+def get_image_extension(image_format: str) -> str:
+    return 'jpg' if image_format == 'JPEG' else image_format.lower()
+
+
+def get_executor():
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_PROCESSING_WORKERS,
+            mp_context=multiprocessing.get_context('forkserver'),
+            initializer=django.setup
+        )
+        _executor_pid = os.getpid()
+    return _executor
+
+
+def reset_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+
+
+def submit(*args):
+    try:
+        return get_executor().submit(*args)
+    except BrokenProcessPool:
+        reset_executor()
+        return get_executor().submit(*args)
+
+
+def reencode_image(data: bytes, image_format: str, max_dimension: int,
+                   quality: int) -> bytes:
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_dimension, max_dimension))
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands()
+                                  else 'RGB')
+        if image_format == 'JPEG' and image.mode != 'RGB':
+            image = image.convert('RGB')
+        output = io.BytesIO()
+        image.save(
+            output,
+            image_format,
+            quality=quality,
+            optimize=True,
+            progressive=True
+        )
+    return output.getvalue()
+
+
+def store_image(recipe_pk: int, original_name: str, content: bytes):
+    storage = Recipe._meta.get_field('image').storage
+    path = PurePosixPath(original_name)
+    extension = get_image_extension(get_image_format())
+    saved_name = storage.save(
+        str(path.with_suffix(f'.{extension}')), ContentFile(content)
+    )
+    updated = Recipe.objects.filter(
+        pk=recipe_pk, image=original_name
+    ).update(image=saved_name)
+    if updated:
+        storage.delete(original_name)
+        bump_cache_version(RECIPE_CACHE_VERSION_KEY.format(recipe_pk))
+    else:
+        storage.delete(saved_name)
+
+
+def on_image_reencoded(recipe_pk: int, original_name: str, args, future):
+    try:
+        try:
+            content = future.result()
+        except BrokenProcessPool:
+            content = reencode_image(*args)
+        store_image(recipe_pk, original_name, content)
+    except Exception:
+        logger.exception('Не удалось обработать изображение рецепта %s',
+                         recipe_pk)
+    finally:
+        connection.close()
+
+
+def ingest_recipe_image(recipe: Recipe):
+    original_name = recipe.image.name
+    if not original_name:
+        return
+    try:
+        with recipe.image.open('rb') as file:
+            data = file.read()
+        args = (
+            data,
+            get_image_format(),
+            settings.IMAGE_MAX_DIMENSION,
+            settings.IMAGE_QUALITY
+        )
+        if not settings.IMAGE_PROCESSING_WORKERS:
+            store_image(recipe.pk, original_name, reencode_image(*args))
+            return
+        submit(reencode_image, *args).add_done_callback(
+            partial(on_image_reencoded, recipe.pk, original_name, args)
+        )
+    except Exception:
+        logger.exception('Не удалось обработать изображение рецепта %s',
+                         recipe.pk)
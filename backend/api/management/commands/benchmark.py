@@ -0,0 +1,184 @@
+import io
+import time
+from statistics import quantiles
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.cache import get_tag_ids_by_slug
+from recipes.models import Recipe, Tag
+from users.models import CustomUser
+
+QUERY_BUDGETS = {
+    'recipes': 5,
+    'recipes-anonymous': 4,
+    'recipes-author': 5,
+    'recipes-tags': 5,
+    'recipes-tags-all': 5,
+    'recipes-search': 5,
+    'recipes-is-favorited': 5,
+    'recipes-is-in-shopping-cart': 5,
+    'recipes-cursor': 4,
+    'recipes-no-count': 4,
+    'recipe-detail': 4,
+    'recipes-feed': 5,
+    'subscriptions': 3,
+    'subscriptions-cursor': 2,
+    'download-shopping-cart-txt': 1,
+    'download-shopping-cart-csv': 1,
+    'download-shopping-cart-json': 1,
+    'ingredients': 1,
+    'ingredients-search': 1,
+    'tags': 1,
+    'favorite-create': 8,
+    'favorite-delete': 6,
+    'shopping-cart-create': 7,
+    'shopping-cart-delete': 3,
+}
+
+
+class Command(BaseCommand):
+    help = ('Измеряет время ответа и количество SQL-запросов эндпоинтов '
+            'на тестовой базе данных и проверяет бюджеты запросов')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--recipes', type=int, default=500)
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict.get('NAME')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            cache.clear()
+            self.seed(options.get('users'), options.get('recipes'),
+                      options.get('seed'))
+            results = self.run(options.get('iterations'))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            cache.clear()
+        self.report(results)
+
+    def seed(self, users_count, recipes_count, seed):
+        call_command(
+            'generate_data', users=users_count, recipes=recipes_count,
+            favorites=10, carts=10, subscriptions=8, seed=seed,
+            prefix='user', stdout=io.StringIO()
+        )
+        self.user = CustomUser.objects.annotate(
+            subscriptions_count=Count('subscriber')
+        ).order_by('-subscriptions_count', 'pk').first()
+        self.recipes = list(
+            Recipe.objects.exclude(favorites__user=self.user)
+            .exclude(shopping_cart__user=self.user)
+            .order_by('pk')
+        )
+        self.tags = list(Tag.objects.order_by('pk'))
+        get_tag_ids_by_slug()
+
+    def get_endpoints(self):
+        recipe = self.recipes[0]
+        tags = '&'.join(f'tags={tag.slug}' for tag in self.tags[:2])
+        return (
+            ('recipes', 'get', '/api/recipes/', True),
+            ('recipes-anonymous', 'get', '/api/recipes/', False),
+            ('recipes-author', 'get',
+             f'/api/recipes/?author={recipe.author_id}', True),
+            ('recipes-tags', 'get', f'/api/recipes/?{tags}', True),
+            ('recipes-tags-all', 'get',
+             f'/api/recipes/?{tags}&match=all', True),
+            ('recipes-search', 'get', '/api/recipes/?search=рецепт 7', True),
+            ('recipes-is-favorited', 'get',
+             '/api/recipes/?is_favorited=1', True),
+            ('recipes-is-in-shopping-cart', 'get',
+             '/api/recipes/?is_in_shopping_cart=1', True),
+            ('recipes-cursor', 'get',
+             '/api/recipes/?pagination=cursor&count=false', True),
+            ('recipes-no-count', 'get',
+             '/api/recipes/?count=false&page=5', True),
+            ('recipe-detail', 'get', f'/api/recipes/{recipe.pk}/', True),
+            ('recipes-feed', 'get', '/api/recipes/feed/', True),
+            ('subscriptions', 'get',
+             '/api/users/subscriptions/?recipes_limit=3', True),
+            ('subscriptions-cursor', 'get',
+             '/api/users/subscriptions/?recipes_limit=3'
+             '&pagination=cursor&count=false', True),
+            ('download-shopping-cart-txt', 'get',
+             '/api/recipes/download_shopping_cart/?type=txt', True),
+            ('download-shopping-cart-csv', 'get',
+             '/api/recipes/download_shopping_cart/?type=csv', True),
+            ('download-shopping-cart-json', 'get',
+             '/api/recipes/download_shopping_cart/?type=json', True),
+            ('ingredients', 'get', '/api/ingredients/', False),
+            ('ingredients-search', 'get',
+             '/api/ingredients/?name=мо&limit=20', False),
+            ('tags', 'get', '/api/tags/', False),
+        )
+
+    def request(self, client, method, url):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(client, method)(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            raise CommandError(
+                f'{method.upper()} {url}: ответ {response.status_code}'
+            )
+        return elapsed, len(queries)
+
+    def run(self, iterations):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        anonymous_client = APIClient()
+        results = {}
+        for name, method, url, authenticated in self.get_endpoints():
+            results[name] = [
+                self.request(
+                    client if authenticated else anonymous_client,
+                    method, url
+                ) for _ in range(iterations)
+            ]
+        for name, path in (('favorite', 'favorite'),
+                           ('shopping-cart', 'shopping_cart')):
+            created, deleted = [], []
+            for recipe in self.recipes[-iterations:]:
+                url = f'/api/recipes/{recipe.pk}/{path}/'
+                created.append(self.request(client, 'post', url))
+                deleted.append(self.request(client, 'delete', url))
+            results[f'{name}-create'] = created
+            results[f'{name}-delete'] = deleted
+        return results
+
+    def report(self, results):
+        over_budget = []
+        self.stdout.write(
+            f'{"эндпоинт":<30}{"p50, мс":>10}{"p95, мс":>10}'
+            f'{"p99, мс":>10}{"запросы":>10}{"бюджет":>10}'
+        )
+        for name, measurements in results.items():
+            timings = [elapsed * 1000 for elapsed, _ in measurements]
+            percentiles = (
+                quantiles(timings, n=100) if len(timings) > 1 else timings * 99
+            )
+            queries = max(count for _, count in measurements)
+            budget = QUERY_BUDGETS.get(name)
+            line = (f'{name:<30}{percentiles[49]:>10.2f}'
+                    f'{percentiles[94]:>10.2f}{percentiles[98]:>10.2f}'
+                    f'{queries:>10}{budget:>10}')
+            if queries > budget:
+                over_budget.append(name)
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+        if over_budget:
+            raise CommandError(
+                f'Превышен бюджет SQL-запросов: {", ".join(over_budget)}'
+            )
+        self.stdout.write(self.style.SUCCESS('Бюджеты запросов соблюдены'))
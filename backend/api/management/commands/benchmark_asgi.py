@@ -0,0 +1,152 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from statistics import quantiles
+from types import ModuleType
+
+from asgiref.sync import ThreadSensitiveContext
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import AsyncClient, Client, override_settings
+from django.urls import include, path
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.async_views import urlpatterns as async_urlpatterns
+from api.management.commands.benchmark import Command as BenchmarkCommand
+from api.urls import urlpatterns as api_urlpatterns
+
+SYNC_URLPATTERNS = [
+    pattern for pattern in api_urlpatterns
+    if pattern not in async_urlpatterns
+]
+
+
+def build_urlconf(name, patterns):
+    urlconf = ModuleType(name)
+    urlconf.urlpatterns = [path('api/', include(patterns))]
+    return urlconf
+
+
+DEPLOYMENTS = {
+    'wsgi': build_urlconf('wsgi_urls', SYNC_URLPATTERNS),
+    'asgi': build_urlconf('asgi_urls', async_urlpatterns + SYNC_URLPATTERNS),
+}
+
+
+def split(total, parts):
+    return [
+        total // parts + (1 if index < total % parts else 0)
+        for index in range(parts)
+    ]
+
+
+class Command(BenchmarkCommand):
+    help = ('Сравнивает пропускную способность эндпоинтов чтения '
+            'под WSGI (синхронные view) и ASGI (асинхронные view) '
+            'при конкурентной нагрузке')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--recipes', type=int, default=500)
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict.get('NAME')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            cache.clear()
+            self.seed(options.get('users'), options.get('recipes'),
+                      options.get('seed'))
+            headers = {
+                'Authorization': f'Bearer {AccessToken.for_user(self.user)}'
+            }
+            results = {}
+            for name, url in self.get_read_endpoints():
+                for deployment, run in (('wsgi', self.run_wsgi),
+                                        ('asgi', self.run_asgi)):
+                    with override_settings(
+                        ROOT_URLCONF=DEPLOYMENTS.get(deployment)
+                    ):
+                        results[name, deployment] = run(
+                            url, headers, options.get('requests'),
+                            options.get('concurrency')
+                        )
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            cache.clear()
+        self.report_throughput(results, options.get('concurrency'))
+
+    def get_read_endpoints(self):
+        return (
+            ('recipes', '/api/recipes/'),
+            ('recipe-detail', f'/api/recipes/{self.recipes[0].pk}/'),
+            ('tags', '/api/tags/'),
+            ('ingredients-search', '/api/ingredients/?name=мо&limit=20'),
+            ('subscriptions', '/api/users/subscriptions/?recipes_limit=3'),
+        )
+
+    @staticmethod
+    def run_wsgi(url, headers, requests, concurrency):
+        def worker(count):
+            client = Client()
+            timings = []
+            for _ in range(count):
+                started = time.perf_counter()
+                response = client.get(url, headers=headers)
+                timings.append(
+                    (time.perf_counter() - started, response.status_code)
+                )
+            connections.close_all()
+            return timings
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            chunks = list(executor.map(worker, split(requests, concurrency)))
+        return time.perf_counter() - started, sum(chunks, [])
+
+    @staticmethod
+    def run_asgi(url, headers, requests, concurrency):
+        async def worker(count):
+            client = AsyncClient()
+            timings = []
+            for _ in range(count):
+                async with ThreadSensitiveContext():
+                    started = time.perf_counter()
+                    response = await client.get(
+                        url, headers=headers
+                    )
+                    timings.append(
+                        (time.perf_counter() - started, response.status_code)
+                    )
+            return timings
+
+        async def run():
+            return await asyncio.gather(
+                *(worker(count) for count in split(requests, concurrency))
+            )
+
+        started = time.perf_counter()
+        chunks = asyncio.run(run())
+        return time.perf_counter() - started, sum(chunks, [])
+
+    def report_throughput(self, results, concurrency):
+        self.stdout.write(f'Конкурентность: {concurrency}')
+        self.stdout.write(
+            f'{"эндпоинт":<22}{"сервер":>8}{"запр/с":>10}'
+            f'{"p50, мс":>10}{"p95, мс":>10}{"ошибки":>8}'
+        )
+        for (name, deployment), (elapsed, timings) in results.items():
+            latencies = [duration * 1000 for duration, _ in timings]
+            percentiles = (
+                quantiles(latencies, n=100) if len(latencies) > 1
+                else latencies * 99
+            )
+            errors = sum(1 for _, code in timings if code != 200)
+            self.stdout.write(
+                f'{name:<22}{deployment:>8}{len(timings) / elapsed:>10.1f}'
+                f'{percentiles[49]:>10.2f}{percentiles[94]:>10.2f}'
+                f'{errors:>8}'
+            )
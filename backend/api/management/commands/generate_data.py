@@ -0,0 +1,222 @@
+import io
+import random
+import time
+from itertools import accumulate, islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from recipes.constants import (MAX_AMOUNT_OF_PRODUCTS, MAX_COOKING_TIME,
+                               MIN_AMOUNT_OF_PRODUCTS, MIN_COOKING_TIME)
+from recipes.models import (FeedEntry, Ingredient, Recipe, RecipeFavourite,
+                            RecipeIngredient, RecipeTag, ShoppingCart, Tag)
+from users.models import CustomUser, Subscription
+
+DEFAULT_BATCH_SIZE = 5000
+
+ACTIVITY_SHAPE = 1.5
+
+MAX_TAGS_PER_RECIPE = 3
+
+MIN_INGREDIENTS_PER_RECIPE = 3
+
+MAX_INGREDIENTS_PER_RECIPE = 12
+
+TAGS = (
+    ('Завтрак', '#E26C2D', 'breakfast'),
+    ('Обед', '#49B64E', 'lunch'),
+    ('Ужин', '#8775D2', 'dinner'),
+    ('Десерт', '#F2C94C', 'dessert'),
+    ('Выпечка', '#2F80ED', 'bakery'),
+)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def power_law_cum_weights(count, exponent):
+    return list(accumulate(
+        1 / (rank + 1) ** exponent for rank in range(count)
+    ))
+
+
+class Command(BaseCommand):
+    help = ('Генерирует синтетических пользователей, рецепты, избранное, '
+            'списки покупок и подписки со степенным распределением')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--recipes', type=int, default=100000)
+        parser.add_argument('--favorites', type=int, default=10,
+                            help='Среднее число избранных рецептов')
+        parser.add_argument('--carts', type=int, default=5,
+                            help='Среднее число рецептов в списке покупок')
+        parser.add_argument('--subscriptions', type=int, default=8,
+                            help='Среднее число подписок пользователя')
+        parser.add_argument('--exponent', type=float, default=1.1,
+                            help='Показатель степенного распределения '
+                                 'популярности авторов и рецептов')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='synthetic')
+        parser.add_argument('--password', default=None)
+        parser.add_argument('--batch-size', type=int,
+                            default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options.get('users') < 1 or options.get('recipes') < 1:
+            raise CommandError('Нужен хотя бы один пользователь и рецепт!')
+        if CustomUser.objects.filter(
+            username__startswith=options.get('prefix')
+        ).exists():
+            raise CommandError(
+                'Пользователи с таким префиксом уже существуют, '
+                'укажите другой --prefix!'
+            )
+        self.random = random.Random(options.get('seed'))
+        self.exponent = options.get('exponent')
+        self.batch_size = options.get('batch_size')
+        started = time.perf_counter()
+
+        ingredient_ids = self.get_ingredient_ids()
+        tag_ids = self.get_tag_ids()
+        user_ids = self.create_users(
+            options.get('users'), options.get('prefix'),
+            options.get('password')
+        )
+        authors = self.rank(user_ids)
+        recipe_ids = self.create_recipes(options.get('recipes'), authors)
+        self.insert(RecipeTag, (
+            RecipeTag(recipe_id=recipe_id, tag_id=tag_id)
+            for recipe_id in recipe_ids
+            for tag_id in self.random.sample(
+                tag_ids, self.random.randint(1, MAX_TAGS_PER_RECIPE)
+            )
+        ))
+        self.insert(RecipeIngredient, (
+            RecipeIngredient(
+                recipe_id=recipe_id,
+                ingredient_id=ingredient_id,
+                amount=self.random.randint(
+                    MIN_AMOUNT_OF_PRODUCTS, MAX_AMOUNT_OF_PRODUCTS
+                )
+            )
+            for recipe_id in recipe_ids
+            for ingredient_id in self.random.sample(
+                ingredient_ids, self.random.randint(
+                    MIN_INGREDIENTS_PER_RECIPE, MAX_INGREDIENTS_PER_RECIPE
+                )
+            )
+        ))
+        popular_recipes = self.rank(recipe_ids)
+        self.insert(RecipeFavourite, (
+            RecipeFavourite(user_id=user_id, recipe_id=recipe_id)
+            for user_id, recipe_id in self.pick(
+                user_ids, popular_recipes, options.get('favorites')
+            )
+        ))
+        self.insert(ShoppingCart, (
+            ShoppingCart(user_id=user_id, recipe_id=recipe_id)
+            for user_id, recipe_id in self.pick(
+                user_ids, popular_recipes, options.get('carts')
+            )
+        ))
+        self.insert(Subscription, (
+            Subscription(user_id=user_id, author_id=author_id)
+            for user_id, author_id in self.pick(
+                user_ids, authors, options.get('subscriptions')
+            )
+            if user_id != author_id
+        ))
+        call_command('reconcile_counters', stdout=self.stdout)
+        FeedEntry.objects.fill()
+        self.stdout.write(
+            f'{FeedEntry._meta.verbose_name_plural}: '
+            f'{FeedEntry.objects.count()} строк'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные сгенерированы за {time.perf_counter() - started:.1f} с'
+        ))
+
+    def get_ingredient_ids(self):
+        if not Ingredient.objects.exists():
+            call_command('load_ingredients', stdout=io.StringIO())
+        ingredient_ids = list(Ingredient.objects.values_list('id', flat=True))
+        if len(ingredient_ids) < MAX_INGREDIENTS_PER_RECIPE:
+            raise CommandError('Недостаточно ингредиентов в каталоге!')
+        return ingredient_ids
+
+    def get_tag_ids(self):
+        existing = set(Tag.objects.values_list('slug', flat=True))
+        Tag.objects.bulk_create(
+            Tag(name=name, color=color, slug=slug)
+            for name, color, slug in TAGS
+            if slug not in existing
+        )
+        return list(Tag.objects.values_list('id', flat=True))
+
+    def create_users(self, count, prefix, password):
+        password = make_password(password)
+        return self.insert(CustomUser, (
+            CustomUser(
+                email=f'{prefix}{index}@foodgram.ru',
+                username=f'{prefix}{index}',
+                first_name=f'Имя{index}',
+                last_name=f'Фамилия{index}',
+                password=password
+            ) for index in range(count)
+        ))
+
+    def create_recipes(self, count, authors):
+        cum_weights = power_law_cum_weights(len(authors), self.exponent)
+        return self.insert(Recipe, (
+            Recipe(
+                name=f'Рецепт {index}',
+                text='Описание рецепта ' * 10,
+                cooking_time=self.random.randint(
+                    MIN_COOKING_TIME, MAX_COOKING_TIME // 8
+                ),
+                image='media/recipes/synthetic.png',
+                author_id=author_id
+            )
+            for index, author_id in enumerate(self.random.choices(
+                authors, cum_weights=cum_weights, k=count
+            ))
+        ))
+
+    def rank(self, ids):
+        ranked = list(ids)
+        self.random.shuffle(ranked)
+        return ranked
+
+    def pick(self, user_ids, targets, average):
+        cum_weights = power_law_cum_weights(len(targets), self.exponent)
+        scale = average * (ACTIVITY_SHAPE - 1) / ACTIVITY_SHAPE
+        for user_id in user_ids:
+            count = min(
+                len(targets),
+                int(scale * self.random.paretovariate(ACTIVITY_SHAPE))
+            )
+            for target_id in set(self.random.choices(
+                targets, cum_weights=cum_weights, k=count
+            )):
+                yield user_id, target_id
+
+    def insert(self, model, objects):
+        started = time.perf_counter()
+        ids = []
+        for batch in batched(objects, self.batch_size):
+            with transaction.atomic():
+                ids.extend(
+                    obj.pk for obj in model.objects.bulk_create(batch)
+                )
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        self.stdout.write(
+            f'{model._meta.verbose_name_plural}: {len(ids)} строк, '
+            f'{len(ids) / elapsed:.0f} строк/с'
+        )
+        return ids
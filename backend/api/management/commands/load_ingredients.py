@@ -0,0 +1,178 @@
+import csv
+import io
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.search import ingredient_index
+from recipes.models import Ingredient
+
+DEFAULT_PATH = settings.BASE_DIR / 'data' / 'ingredients.csv'
+
+DEFAULT_BATCH_SIZE = 10000
+
+JSON_CHUNK_SIZE = 64 * 1024
+
+JSON_SEPARATORS = frozenset(' \t\r\n,')
+
+
+def read_csv(file):
+    for row in csv.reader(file):
+        if len(row) >= 2:
+            yield row[0], row[1]
+
+
+def skip_separators(buffer, index):
+    while index < len(buffer) and buffer[index] in JSON_SEPARATORS:
+        index += 1
+    return index
+
+
+def read_json(file):
+    decoder = json.JSONDecoder()
+    buffer = file.read(JSON_CHUNK_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise CommandError('JSON-файл должен содержать список ингредиентов!')
+    index = 1
+    while True:
+        index = skip_separators(buffer, index)
+        if buffer.startswith(']', index):
+            return
+        try:
+            item, index = decoder.raw_decode(buffer, index)
+        except json.JSONDecodeError:
+            chunk = file.read(JSON_CHUNK_SIZE)
+            if not chunk:
+                raise CommandError('Некорректный JSON-файл!')
+            buffer, index = buffer[index:] + chunk, 0
+            continue
+        yield item.get('name'), item.get('measurement_unit')
+
+
+READERS = {
+    'csv': read_csv,
+    'json': read_json,
+}
+
+
+def unique_rows(rows):
+    seen = set()
+    for name, measurement_unit in rows:
+        if not name or not measurement_unit:
+            continue
+        key = (name.strip(), measurement_unit.strip())
+        if key not in seen:
+            seen.add(key)
+            yield key
+
+
+def batched(rows, batch_size):
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = 'Загружает каталог ингредиентов из CSV- или JSON-файла'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            nargs='?',
+            default=str(DEFAULT_PATH),
+            help='Путь к файлу с ингредиентами'
+        )
+        parser.add_argument(
+            '--format',
+            choices=READERS.keys(),
+            help='Формат файла (по умолчанию определяется по расширению)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одной пачке вставки'
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Не использовать COPY даже на PostgreSQL'
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options.get('path'))
+        file_format = options.get('format') or path.suffix.lstrip('.')
+        if file_format not in READERS:
+            raise CommandError(f'Неизвестный формат файла: {file_format}')
+        if not path.exists():
+            raise CommandError(f'Файл {path} не найден!')
+
+        use_copy = (connection.vendor == 'postgresql'
+                    and not options.get('no_copy'))
+        load = self.load_with_copy if use_copy else self.load_with_orm
+
+        started = time.perf_counter()
+        with open(path, encoding='utf-8', newline='') as file:
+            rows = unique_rows(READERS.get(file_format)(file))
+            total, created = load(rows, options.get('batch_size'))
+        elapsed = time.perf_counter() - started
+        ingredient_index.invalidate()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано строк: {total}, добавлено новых: {created} '
+            f'за {elapsed:.2f} с ({total / max(elapsed, 1e-6):.0f} строк/с)'
+        ))
+
+    @transaction.atomic
+    def load_with_orm(self, rows, batch_size):
+        total = 0
+        count_before = Ingredient.objects.count()
+        for batch in batched(rows, batch_size):
+            Ingredient.objects.bulk_create(
+                (
+                    Ingredient(name=name, measurement_unit=measurement_unit)
+                    for name, measurement_unit in batch
+                ),
+                batch_size=batch_size,
+                ignore_conflicts=True
+            )
+            total += len(batch)
+        return total, Ingredient.objects.count() - count_before
+
+    @transaction.atomic
+    def load_with_copy(self, rows, batch_size):
+        table = connection.ops.quote_name(Ingredient._meta.db_table)
+        total = 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TEMPORARY TABLE ingredient_import '
+                '(name text, measurement_unit text) ON COMMIT DROP'
+            )
+            for batch in batched(rows, batch_size):
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(batch)
+                buffer.seek(0)
+                self.copy(cursor.cursor, buffer)
+                total += len(batch)
+            cursor.execute(
+                f'INSERT INTO {table} (name, measurement_unit) '
+                f'SELECT name, measurement_unit FROM ingredient_import '
+                f'ON CONFLICT (name, measurement_unit) DO NOTHING'
+            )
+            created = cursor.rowcount
+        return total, created
+
+    @staticmethod
+    def copy(raw_cursor, buffer):
+        sql = ('COPY ingredient_import (name, measurement_unit) '
+               'FROM STDIN WITH (FORMAT csv)')
+        if hasattr(raw_cursor, 'copy_expert'):
+            raw_cursor.copy_expert(sql, buffer)
+        else:
+            with raw_cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from recipes.models import Recipe, RecipeFavourite
+from users.models import CustomUser, Subscription
+
+DEFAULT_BATCH_SIZE = 10000
+
+COUNTERS = (
+    (Recipe, 'favorites_count', RecipeFavourite, 'recipe'),
+    (CustomUser, 'recipes_count', Recipe, 'author'),
+    (CustomUser, 'subscribers_count', Subscription, 'author'),
+)
+
+
+def count_related(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(count=Count('pk'))
+            .values('count')
+        ),
+        0
+    )
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает денормализованные счётчики избранного, '
+            'рецептов и подписчиков и исправляет расхождения')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int,
+                            default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Только показать число расхождений')
+
+    def handle(self, *args, **options):
+        for model, field, related_model, related_field in COUNTERS:
+            drifted = self.reconcile(
+                model, field, count_related(related_model, related_field),
+                options.get('batch_size'), options.get('dry_run')
+            )
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}.{field}: '
+                f'расхождений {drifted}'
+            )
+
+    def reconcile(self, model, field, actual, batch_size, dry_run):
+        bounds = model.objects.aggregate(first=Min('pk'), last=Max('pk'))
+        if bounds.get('first') is None:
+            return 0
+        drifted = 0
+        for start in range(bounds['first'], bounds['last'] + 1, batch_size):
+            with transaction.atomic():
+                pks = list(
+                    model.objects.filter(
+                        pk__gte=start, pk__lt=start + batch_size
+                    ).alias(actual=actual).exclude(
+                        **{field: F('actual')}
+                    ).select_for_update().values_list('pk', flat=True)
+                )
+                if pks and not dry_run:
+                    model.objects.filter(pk__in=pks).update(**{field: actual})
+            drifted += len(pks)
+        return drifted
@@ -0,0 +1,251 @@
+import heapq
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import (iscoroutinefunction, markcoroutinefunction,
+                          sync_to_async)
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.serializers import ListSerializer, Serializer
+
+from api.constants import REPLICA_PIN_COOKIE
+from api.db import get_pool_stats
+from foodgram.routers import read_db
+
+logger = logging.getLogger(__name__)
+
+serialization_timer = ContextVar('serialization_timer', default=None)
+
+
+class QueryRecorder:
+
+    def __init__(self, slowest_count: int):
+        self.slowest_count = slowest_count
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.duration += duration
+            if len(self.slowest) < self.slowest_count:
+                heapq.heappush(self.slowest, (duration, sql))
+            else:
+                heapq.heappushpop(self.slowest, (duration, sql))
+
+
+class SerializationTimer:
+
+    def __init__(self, recorder: QueryRecorder):
+        self.recorder = recorder
+        self.depth = 0
+        self.duration = 0.0
+
+    def __enter__(self):
+        if not self.depth:
+            self.started = time.perf_counter()
+            self.db_started = self.recorder.duration
+        self.depth += 1
+
+    def __exit__(self, *exc_info):
+        self.depth -= 1
+        if not self.depth:
+            self.duration += max(
+                time.perf_counter() - self.started
+                - (self.recorder.duration - self.db_started), 0.0
+            )
+
+
+def timed_data(get_data):
+    def data(serializer):
+        timer = serialization_timer.get()
+        if timer is None:
+            return get_data(serializer)
+        with timer:
+            return get_data(serializer)
+
+    data.timed = True
+    return data
+
+
+class SyncAndAsyncMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.call(request)
+
+
+class DatabaseInstrumentationMiddleware(SyncAndAsyncMiddleware):
+
+    def __init__(self, get_response):
+        if not settings.DB_INSTRUMENTATION_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        for serializer_class in (Serializer, ListSerializer):
+            if not getattr(serializer_class.data.fget, 'timed', False):
+                serializer_class.data = property(
+                    timed_data(serializer_class.data.fget)
+                )
+
+    @staticmethod
+    def instrument(stack, recorder):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+
+    def call(self, request):
+        recorder = QueryRecorder(settings.DB_INSTRUMENTATION_SLOWEST_QUERIES)
+        timer = SerializationTimer(recorder)
+        token = serialization_timer.set(timer)
+        request.render_duration = 0.0
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                self.instrument(stack, recorder)
+                response = self.get_response(request)
+        finally:
+            serialization_timer.reset(token)
+        return self.add_timings(request, response, recorder, timer, started)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder(settings.DB_INSTRUMENTATION_SLOWEST_QUERIES)
+        timer = SerializationTimer(recorder)
+        token = serialization_timer.set(timer)
+        request.render_duration = 0.0
+        started = time.perf_counter()
+        stack = ExitStack()
+        await sync_to_async(self.instrument)(stack, recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            serialization_timer.reset(token)
+        return self.add_timings(request, response, recorder, timer, started)
+
+    def add_timings(self, request, response, recorder, timer, started):
+        total = time.perf_counter() - started
+        serialize = timer.duration
+        render = request.render_duration
+        view = max(total - recorder.duration - serialize - render, 0.0)
+
+        pool_stats = get_pool_stats()
+        pool_timings = tuple(
+            f'pool-{alias};desc="{stats.get("pool_available", 0)}/'
+            f'{stats.get("pool_size", 0)} available, '
+            f'{stats.get("requests_waiting", 0)} waiting"'
+            for alias, stats in pool_stats.items()
+        )
+
+        if response.streaming:
+            response['Server-Timing'] = ', '.join((
+                f'total;dur={total * 1000:.2f};desc="before streaming"',
+                *pool_timings,
+            ))
+            return response
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={recorder.duration * 1000:.2f};'
+            f'desc="{recorder.count} queries"',
+            f'view;dur={view * 1000:.2f};desc="view excl. serialization"',
+            f'serialize;dur={serialize * 1000:.2f};desc="serializer data"',
+            f'render;dur={render * 1000:.2f};desc="response rendering"',
+            f'total;dur={total * 1000:.2f}',
+            *pool_timings,
+        ))
+        if (total * 1000 >= settings.DB_INSTRUMENTATION_SLOW_REQUEST_MS
+                and random.random()
+                < settings.DB_INSTRUMENTATION_LOG_SAMPLE_RATE):
+            self.log_slow_request(request, response, recorder, total, view,
+                                  serialize, render, pool_stats)
+        return response
+
+    def process_template_response(self, request, response):
+        started = time.perf_counter()
+
+        def record_render_duration(response):
+            request.render_duration = time.perf_counter() - started
+
+        response.add_post_render_callback(record_render_duration)
+        return response
+
+    @staticmethod
+    def log_slow_request(request, response, recorder, total, view,
+                         serialize, render, pool_stats):
+        resolver_match = request.resolver_match
+        logger.warning(json.dumps({
+            'event': 'slow_request',
+            'method': request.method,
+            'path': request.get_full_path(),
+            'view': resolver_match.view_name if resolver_match else None,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'db_ms': round(recorder.duration * 1000, 2),
+            'view_ms': round(view * 1000, 2),
+            'serialize_ms': round(serialize * 1000, 2),
+            'render_ms': round(render * 1000, 2),
+            'queries': recorder.count,
+            'slowest_queries': [
+                {'ms': round(duration * 1000, 2), 'sql': sql}
+                for duration, sql in sorted(recorder.slowest, reverse=True)
+            ],
+            'pools': pool_stats,
+        }, ensure_ascii=False))
+
+
+class ReplicaRoutingMiddleware(SyncAndAsyncMiddleware):
+
+    def __init__(self, get_response):
+        if not settings.DB_REPLICA_ALIASES:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    @staticmethod
+    def get_read_db(request):
+        if (request.method not in SAFE_METHODS
+                or REPLICA_PIN_COOKIE in request.COOKIES):
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DB_REPLICA_ALIASES)
+
+    def call(self, request):
+        token = read_db.set(self.get_read_db(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            read_db.reset(token)
+        return self.pin(request, response)
+
+    async def __acall__(self, request):
+        token = read_db.set(self.get_read_db(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            read_db.reset(token)
+        return self.pin(request, response)
+
+    @staticmethod
+    def pin(request, response):
+        if (request.method not in SAFE_METHODS
+                and response.status_code < 400):
+            response.set_cookie(
+                REPLICA_PIN_COOKIE, '1',
+                max_age=settings.DB_REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax'
+            )
+        return response
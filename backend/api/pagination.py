@@ -1,6 +1,131 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CustomCursorPagination(CursorPagination):
+    page_size_query_param = 'limit'
+    page_size = 6
+    ordering = '-id'
+
+
+class FeedPagination(CustomCursorPagination):
+    ordering = '-recipe_id'
 
 
 class CustomPagination(PageNumberPagination):
     page_size_query_param = 'limit'
     page_size = 6
+    mode_query_param = 'pagination'
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.count = None
+        self.cursor_paginator = None
+        with_count = request.query_params.get(
+            self.count_query_param
+        ) != 'false'
+
+        if request.query_params.get(self.mode_query_param) == 'cursor':
+            self.cursor_paginator = CustomCursorPagination()
+            self.cursor_paginator.ordering = getattr(
+                view, 'cursor_ordering', CustomCursorPagination.ordering
+            )
+            if with_count:
+                self.count = queryset.count()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+
+        if with_count:
+            page = super().paginate_queryset(queryset, request, view)
+            self.count = self.page.paginator.count
+            return page
+
+        page_size = self.get_page_size(request)
+        offset = self.get_offset(request, page_size)
+        results = list(queryset[offset:offset + page_size + 1])
+        self.has_next = len(results) > page_size
+        return results[:page_size]
+
+    def get_offset(self, request, page_size):
+        try:
+            self.page_number = max(
+                int(request.query_params.get(self.page_query_param, 1)), 1
+            )
+        except ValueError:
+            self.page_number = 1
+        return (self.page_number - 1) * page_size
+
+    def get_next_link(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_next_link()
+        if self.count is not None:
+            return super().get_next_link()
+        return self.get_next_page_link()
+
+    def get_previous_link(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_previous_link()
+        if self.count is not None:
+            return super().get_previous_link()
+        return self.get_previous_page_link()
+
+    def get_next_page_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.page_query_param,
+            self.page_number + 1
+        )
+
+    def get_previous_page_link(self):
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(
+            url, self.page_query_param, self.page_number - 1
+        )
+
+    def get_paginated_response(self, data):
+        response = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data
+        }
+        if self.count is not None:
+            response = {'count': self.count, **response}
+        return Response(response)
+
+
+class AsyncPagination(CustomPagination):
+
+    async def apaginate_queryset(self, queryset, request):
+        self.request = request
+        self.count = None
+        self.cursor_paginator = None
+        page_size = self.get_page_size(request)
+        offset = self.get_offset(request, page_size)
+        if request.query_params.get(self.count_query_param) != 'false':
+            self.count = await queryset.acount()
+            if offset and offset >= self.count:
+                raise NotFound(self.invalid_page_message.format(
+                    page_number=self.page_number,
+                    message='Эта страница не содержит результатов'
+                ))
+        results = [
+            obj async for obj in queryset[offset:offset + page_size + 1]
+        ]
+        self.has_next = len(results) > page_size
+        return results[:page_size]
+
+    def get_next_link(self):
+        return self.get_next_page_link()
+
+    def get_previous_link(self):
+        return self.get_previous_page_link()
@@ -0,0 +1,23 @@
+import json
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import DataAndFiles, MultiPartParser
+
+
+class JSONFieldsMultiPartParser(MultiPartParser):
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parsed = super().parse(stream, media_type, parser_context)
+        json_fields = getattr(
+            (parser_context or {}).get('view'), 'multipart_json_fields', ()
+        )
+        data = {}
+        for key, values in parsed.data.lists():
+            if key not in json_fields:
+                data[key] = values[-1]
+                continue
+            try:
+                data[key] = json.loads(values[-1])
+            except ValueError:
+                raise ParseError(f'Поле {key} должно содержать JSON!')
+        return DataAndFiles(data, parsed.files.dict())
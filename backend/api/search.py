@@ -0,0 +1,148 @@
+import logging
+import threading
+from array import array
+from bisect import bisect_left
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+
+from api.cache import (INGREDIENT_CACHE_VERSION_KEY, aget_cache_version,
+                       bump_cache_version, get_cache_version)
+from api.constants import INGREDIENT_SEARCH_GRAM_SIZE
+from recipes.models import Ingredient
+
+logger = logging.getLogger(__name__)
+
+
+class IngredientIndex:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._snapshot = (None, [], [], {})
+
+    def invalidate(self):
+        bump_cache_version(INGREDIENT_CACHE_VERSION_KEY)
+
+    def get_snapshot(self):
+        return self.refresh(get_cache_version(INGREDIENT_CACHE_VERSION_KEY))
+
+    async def aget_snapshot(self):
+        version = await aget_cache_version(INGREDIENT_CACHE_VERSION_KEY)
+        if self._snapshot[0] is None:
+            return await sync_to_async(self.refresh)(version)
+        return self.refresh(version)
+
+    def refresh(self, version):
+        snapshot = self._snapshot
+        if snapshot[0] == version:
+            return snapshot
+        with self._lock:
+            if self._snapshot[0] is None:
+                self.load(version)
+                return self._snapshot
+            if self._refreshing:
+                return self._snapshot
+            self._refreshing = True
+        threading.Thread(
+            target=self.load_in_background, args=(version, ), daemon=True
+        ).start()
+        return snapshot
+
+    def load(self, version):
+        self._snapshot = self.build(
+            version, list(self.get_queryset()), self._snapshot
+        )
+
+    def load_in_background(self, version):
+        try:
+            self.load(version)
+        except Exception:
+            logger.exception('Не удалось перестроить индекс ингредиентов')
+        finally:
+            connections.close_all()
+            self._refreshing = False
+
+    @staticmethod
+    def get_queryset():
+        return Ingredient.objects.values(
+            'id', 'name', 'measurement_unit'
+        ).order_by()
+
+    @staticmethod
+    def build(version, ingredients, previous=None):
+        items = sorted(
+            ingredients,
+            key=lambda item: (
+                item.get('name').casefold(),
+                item.get('measurement_unit')
+            )
+        )
+        if previous is not None and previous[2] == items:
+            return (version, *previous[1:])
+        keys = [item.get('name').casefold() for item in items]
+        size = INGREDIENT_SEARCH_GRAM_SIZE
+        postings = {}
+        for index, key in enumerate(keys):
+            for gram in {
+                key[offset:offset + size]
+                for offset in range(1, len(key) - size + 1)
+            }:
+                postings.setdefault(gram, []).append(index)
+        grams = {
+            gram: array('I', indexes) for gram, indexes in postings.items()
+        }
+        return version, keys, items, grams
+
+    def all(self, limit=None):
+        return self.get_all(self.get_snapshot(), limit)
+
+    def search(self, query: str, limit=None):
+        return self.get_search(self.get_snapshot(), query, limit)
+
+    async def aall(self, limit=None):
+        return self.get_all(await self.aget_snapshot(), limit)
+
+    async def asearch(self, query: str, limit=None):
+        return self.get_search(await self.aget_snapshot(), query, limit)
+
+    @staticmethod
+    def get_all(snapshot, limit=None):
+        _, _, items, _ = snapshot
+        return items[:limit]
+
+    @staticmethod
+    def get_candidates(snapshot, query):
+        _, keys, _, grams = snapshot
+        size = INGREDIENT_SEARCH_GRAM_SIZE
+        if len(query) < size:
+            return range(len(keys))
+        return min(
+            (grams.get(query[offset:offset + size], ())
+             for offset in range(len(query) - size + 1)),
+            key=len
+        )
+
+    @classmethod
+    def get_search(cls, snapshot, query: str, limit=None):
+        _, keys, items, _ = snapshot
+        query = query.casefold()
+        start = bisect_left(keys, query)
+        end = bisect_left(keys, query + chr(0x10FFFF))
+        results = items[start:end][:limit]
+        if limit is not None and len(results) >= limit:
+            return results
+        matches = (
+            index for index in cls.get_candidates(snapshot, query)
+            if (index < start or index >= end) and query in keys[index][1:]
+        )
+        results.extend(
+            items[index] for index in islice(
+                matches, None if limit is None else limit - len(results)
+            )
+        )
+        return results
+
+
+ingredient_index = IngredientIndex()
@@ -1,24 +1,44 @@
+from functools import partial
+
 from django.contrib.auth.hashers import make_password
-from django.http import Http404
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, models, transaction
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
-from api.validators import (validate_amount, validate_field_existance,
+from api.cache import get_recipe_fragments
+from api.fields import RecipeImageField
+from api.images import ingest_recipe_image
+from api.validators import (validate_amount, validate_existing_ids,
+                            validate_field_existance,
                             validate_repetetive_values)
 from recipes.models import (BaseRecipe, Ingredient, Recipe, RecipeFavourite,
                             RecipeIngredient, RecipeTag, ShoppingCart, Tag)
 from users.models import CustomUser, Subscription
 
 
-class CustomUserRetrieveSerializer(serializers.ModelSerializer):
+class CustomUserSerializer(serializers.ModelSerializer):
     email = serializers.CharField(validators=[])
     username = serializers.CharField(validators=[])
+
+    class Meta:
+        model = CustomUser
+        fields = (
+            'id',
+            'email',
+            'username',
+            'first_name',
+            'last_name'
+        )
+
+
+class CustomUserRetrieveSerializer(CustomUserSerializer):
     is_subscribed = serializers.SerializerMethodField(read_only=True)
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         request = self.context.get('request')
         if request is None or request.user.is_anonymous:
             return False
@@ -26,8 +46,7 @@ class CustomUserRetrieveSerializer(serializers.ModelSerializer):
             user=request.user.id
         ).exists()
 
-    class Meta:
-        model = CustomUser
+    class Meta(CustomUserSerializer.Meta):
         fields = (
             'id',
             'email',
@@ -116,9 +135,51 @@ class RecipeIngredientRetrieveSerializer(serializers.ModelSerializer):
         )
 
 
+class RecipeFragmentSerializer(serializers.ModelSerializer):
+    tags = TagSerializer(many=True)
+    ingredients = RecipeIngredientRetrieveSerializer(
+        source='recipe_ingredients',
+        many=True
+    )
+    author = CustomUserSerializer()
+    image = Base64ImageField()
+
+    class Meta:
+        model = Recipe
+        fields = (
+            'id',
+            'name',
+            'text',
+            'cooking_time',
+            'image',
+            'author',
+            'tags',
+            'ingredients'
+        )
+
+
+class RecipeListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        recipes = list(
+            data.all() if isinstance(data, models.manager.BaseManager)
+            else data
+        )
+        fragments = get_recipe_fragments(
+            recipes,
+            lambda recipe: RecipeFragmentSerializer(recipe).data
+        )
+        return [
+            self.child.add_user_fields(recipe, fragments.get(recipe.pk))
+            for recipe in recipes
+        ]
+
+
 class RecipeRetrieveSerializer(serializers.ModelSerializer):
     tags = TagSerializer(many=True)
-    ingredients = serializers.SerializerMethodField()
+    ingredients = RecipeIngredientRetrieveSerializer(
+        source='recipe_ingredients',
+        many=True
+    )
     author = CustomUserRetrieveSerializer(many=False)
     image = Base64ImageField()
     is_favorited = serializers.SerializerMethodField(
@@ -128,21 +189,43 @@ class RecipeRetrieveSerializer(serializers.ModelSerializer):
         method_name='get_is_in_shopping_cart'
     )
 
-    def get_ingredients(self, obj):
-        recipe_ingredients = RecipeIngredient.objects.filter(recipe=obj)
-        ingredients_data = RecipeIngredientRetrieveSerializer(
-            instance=recipe_ingredients,
-            many=True
-        ).data
-        return ingredients_data
+    def to_representation(self, instance):
+        fragments = get_recipe_fragments(
+            (instance, ),
+            lambda recipe: RecipeFragmentSerializer(recipe).data
+        )
+        return self.add_user_fields(instance, fragments.get(instance.pk))
+
+    def add_user_fields(self, instance, fragment):
+        request = self.context.get('request')
+        representation = dict(fragment)
+        if request is not None and representation.get('image'):
+            representation['image'] = request.build_absolute_uri(
+                representation.get('image')
+            )
+        representation['author'] = dict(
+            representation.get('author'),
+            is_subscribed=CustomUserRetrieveSerializer(
+                context=self.context
+            ).get_is_subscribed(instance.author)
+        )
+        representation['is_favorited'] = self.get_is_favorited(instance)
+        representation['is_in_shopping_cart'] = self.get_is_in_shopping_cart(
+            instance
+        )
+        return representation
 
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         request = self.context.get('request')
         if request is None or request.user.is_anonymous:
             return False
         return obj.favorites.filter(user=request.user.id).exists()
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
         request = self.context.get('request')
         if request is None or request.user.is_anonymous:
             return False
@@ -162,19 +245,19 @@ class RecipeRetrieveSerializer(serializers.ModelSerializer):
             'is_favorited',
             'is_in_shopping_cart'
         )
+        list_serializer_class = RecipeListSerializer
 
 
 class RecipeCreateSerializer(serializers.ModelSerializer):
-    tags = serializers.PrimaryKeyRelatedField(
-        queryset=Tag.objects.all(),
-        many=True
+    tags = serializers.ListField(
+        child=serializers.IntegerField()
     )
     ingredients = RecipeIngredientSerializer(
         source='recipe_ingredients',
         many=True
     )
     author = CustomUserRetrieveSerializer(read_only=True)
-    image = Base64ImageField()
+    image = RecipeImageField()
     is_favorited = serializers.SerializerMethodField(
         method_name='get_is_favorited'
     )
@@ -199,17 +282,24 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             value,
             'Встречаются повторяющиеся ингредиенты!'
         )
+        validate_existing_ids(
+            Ingredient,
+            [item.get('id') for item in value],
+            'Нет ингредиентов!'
+        )
         return value
 
     def validate_tags(self, value):
         validate_field_existance(value, 'Вы не добавили тэги!')
         validate_repetetive_values(value, 'Встречаются повторяющиеся тэги!')
+        validate_existing_ids(Tag, value, 'Нет тэгов с такими id!')
         return value
 
     def validate_image(self, value: str):
         validate_field_existance(value, 'Пустое поле image!')
         return value
 
+    @transaction.atomic
     def create(self, validated_data: dict):
         tags = validated_data.pop('tags')
         ingredients = validated_data.pop('recipe_ingredients')
@@ -217,29 +307,14 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             'author': self.context.get('request').user
         })
         recipe = Recipe.objects.create(**validated_data)
-
-        for tag_id in tags:
-            RecipeTag.objects.create(
-                recipe=recipe,
-                tag=tag_id
-            )
-
-        for item in ingredients:
-            try:
-                RecipeIngredient.objects.create(
-                    recipe=recipe,
-                    ingredient=get_object_or_404(
-                        Ingredient, pk=item.get('id')
-                    ),
-                    amount=item.get('amount')
-                )
-            except Http404:
-                raise ValidationError(
-                    detail='Нет ингредиентов!',
-                    code=400
-                )
+        self.add_tags(recipe, tags)
+        self.add_ingredients(recipe, ingredients)
+        transaction.on_commit(
+            partial(ingest_recipe_image, recipe), robust=True
+        )
         return recipe
 
+    @transaction.atomic
     def update(self, instance: Recipe, validated_data):
         if 'tags' in validated_data.keys():
             tags = validated_data.pop('tags')
@@ -248,12 +323,17 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
                     detail='No tags in tag field!',
                     code=400
                 )
-            RecipeTag.objects.filter(recipe=instance).delete()
-            for tag_id in tags:
-                RecipeTag.objects.create(
-                    recipe=instance,
-                    tag=tag_id
-                )
+            current_tags = set(
+                instance.recipe_tags.values_list('tag_id', flat=True)
+            )
+            RecipeTag.objects.filter(
+                recipe=instance,
+                tag_id__in=current_tags - set(tags)
+            ).delete()
+            self.add_tags(
+                instance,
+                [tag_id for tag_id in tags if tag_id not in current_tags]
+            )
         else:
             raise ValidationError(
                 detail='Нет поля \'тэги\'',
@@ -267,22 +347,34 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
                     detail='Нет ингредиентов!',
                     code=400
                 )
-            RecipeIngredient.objects.filter(recipe=instance).delete()
-            for item in ingredients:
-                try:
-                    RecipeIngredient.objects.create(
-                        recipe=instance,
-                        ingredient=get_object_or_404(
-                            Ingredient,
-                            pk=item.get('id')
-                        ),
-                        amount=item.get('amount')
-                    )
-                except Http404:
-                    raise ValidationError(
-                        detail='Нет тегов!',
-                        code=400
-                    )
+            current_ingredients = {
+                recipe_ingredient.ingredient_id: recipe_ingredient
+                for recipe_ingredient in instance.recipe_ingredients.all()
+            }
+            new_ingredients = {
+                item.get('id'): item.get('amount') for item in ingredients
+            }
+            RecipeIngredient.objects.filter(
+                recipe=instance,
+                ingredient_id__in=(
+                    current_ingredients.keys() - new_ingredients.keys()
+                )
+            ).delete()
+            changed_ingredients = []
+            for ingredient_id, amount in new_ingredients.items():
+                recipe_ingredient = current_ingredients.get(ingredient_id)
+                if (recipe_ingredient is not None
+                        and recipe_ingredient.amount != amount):
+                    recipe_ingredient.amount = amount
+                    changed_ingredients.append(recipe_ingredient)
+            RecipeIngredient.objects.bulk_update(
+                changed_ingredients, ('amount', )
+            )
+            self.add_ingredients(
+                instance,
+                [item for item in ingredients
+                 if item.get('id') not in current_ingredients]
+            )
         else:
             raise ValidationError(
                 detail='Нет поля \'Ингредиенты\'',
@@ -297,13 +389,36 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         )
         instance.image = validated_data.get('image', instance.image)
         instance.save()
+        if 'image' in validated_data:
+            transaction.on_commit(
+                partial(ingest_recipe_image, instance), robust=True
+            )
 
         return instance
 
+    @staticmethod
+    def add_tags(recipe: Recipe, tags: list):
+        RecipeTag.objects.bulk_create(
+            RecipeTag(recipe=recipe, tag_id=tag_id) for tag_id in tags
+        )
+
+    @staticmethod
+    def add_ingredients(recipe: Recipe, ingredients: list):
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe,
+                ingredient_id=item.get('id'),
+                amount=item.get('amount')
+            ) for item in ingredients
+        )
+
     def to_representation(self, instance):
+        request = self.context.get('request')
         return RecipeRetrieveSerializer(
-            instance=instance,
-            context={'request': self.context.get('request')}
+            instance=Recipe.objects.with_user_flags(
+                request.user if request is not None else None
+            ).get(pk=instance.pk),
+            context={'request': request}
         ).data
 
     class Meta:
@@ -335,8 +450,12 @@ class RecipeSubscriptionSerializer(serializers.ModelSerializer):
 
 
 class SubscriptionRetrieveSerializer(CustomUserRetrieveSerializer):
-    recipes = serializers.SerializerMethodField(read_only=True)
-    recipes_count = serializers.SerializerMethodField(read_only=True)
+    recipes = RecipeSubscriptionSerializer(
+        source='limited_recipes',
+        many=True,
+        read_only=True
+    )
+    recipes_count = serializers.IntegerField(read_only=True)
 
     class Meta(CustomUserRetrieveSerializer.Meta):
         fields = (
@@ -350,24 +469,6 @@ class SubscriptionRetrieveSerializer(CustomUserRetrieveSerializer):
             'recipes_count'
         )
 
-    def get_recipes(self, value):
-        request = self.context.get('request')
-        user = self.context.get('user')
-        recipes = value.recipes.all()
-        if request and not user.is_anonymous:
-            request = self.context.get('request')
-            limit = request.query_params.get('recipes_limit')
-            if limit:
-                recipes = recipes[:int(limit)]
-        return RecipeSubscriptionSerializer(
-            instance=recipes,
-            many=True,
-            context={'request': request}
-        ).data
-
-    def get_recipes_count(self, value):
-        return value.recipes.count()
-
 
 class SubscriptionSerializer(serializers.ModelSerializer):
 
@@ -377,21 +478,25 @@ class SubscriptionSerializer(serializers.ModelSerializer):
             'author',
             'user',
         )
+        validators = []
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise ValidationError(
+                detail='Вы уже оформили подписку!',
+                code=400
+            )
 
     def to_representation(self, instance):
-        representation = super().to_representation(instance)
         return SubscriptionRetrieveSerializer(
-            instance=get_object_or_404(
-                CustomUser,
-                pk=representation.get('author')
-            ),
-            context={
-                'request': self.context.get('request'),
-                'user': get_object_or_404(
-                    CustomUser,
-                    pk=representation.get('user')
-                )
-            }
+            instance=CustomUser.objects.subscriptions(
+                user=instance.user,
+                recipes_limit=self.context.get('recipes_limit')
+            ).get(pk=instance.author_id),
+            context={'request': self.context.get('request')}
         ).data
 
     def validate(self, data):
@@ -414,6 +519,18 @@ class SubscriptionSerializer(serializers.ModelSerializer):
 
 
 class FavouriteShoppingCartSerializer(serializers.ModelSerializer):
+    error_message = None
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise ValidationError(
+                detail=self.error_message,
+                code=400
+            )
+
     def validate(self, data, **kwargs):
         if not Recipe.objects.filter(pk=data.get('recipe').pk).exists():
             raise ValidationError(
@@ -437,13 +554,16 @@ class FavouriteShoppingCartSerializer(serializers.ModelSerializer):
             'recipe',
             'user'
         )
+        validators = []
 
 
 class FavouriteSerializer(FavouriteShoppingCartSerializer):
+    error_message = 'Вы уже добавили этот рецепт в избранное!'
+
     def validate(self, data, **kwargs):
         return super().validate(data, **{
             'class_name': RecipeFavourite,
-            'error_message': 'Вы уже добавили этот рецепт в избранное!'
+            'error_message': self.error_message
         })
 
     class Meta(FavouriteShoppingCartSerializer.Meta):
@@ -451,10 +571,12 @@ class FavouriteSerializer(FavouriteShoppingCartSerializer):
 
 
 class ShoppingCartSerializer(FavouriteShoppingCartSerializer):
+    error_message = 'Вы уже добавили этот рецепт в корзину!'
+
     def validate(self, data, **kwargs):
         return super().validate(data, **{
             'class_name': ShoppingCart,
-            'error_message': 'Вы уже добавили этот рецепт в корзину!'
+            'error_message': self.error_message
         })
 
     class Meta(FavouriteShoppingCartSerializer.Meta):
@@ -0,0 +1,40 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.cache import (RECIPE_CACHE_VERSION_KEY, TAG_CACHE_VERSION_KEY,
+                       USER_CACHE_VERSION_KEY, bump_cache_version)
+from api.search import ingredient_index
+from recipes.models import Ingredient, Recipe, RecipeIngredient, RecipeTag, Tag
+from users.models import CustomUser
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def invalidate_ingredient_index(sender, **kwargs):
+    transaction.on_commit(ingredient_index.invalidate)
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def invalidate_tag_cache(sender, **kwargs):
+    transaction.on_commit(
+        lambda: bump_cache_version(TAG_CACHE_VERSION_KEY)
+    )
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+def invalidate_recipe_cache(sender, instance, **kwargs):
+    key = RECIPE_CACHE_VERSION_KEY.format(instance.pk)
+    transaction.on_commit(lambda: bump_cache_version(key))
+
+
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+@receiver((post_save, post_delete), sender=RecipeTag)
+def invalidate_recipe_relations_cache(sender, instance, **kwargs):
+    key = RECIPE_CACHE_VERSION_KEY.format(instance.recipe_id)
+    transaction.on_commit(lambda: bump_cache_version(key))
+
+
+@receiver((post_save, post_delete), sender=CustomUser)
+def invalidate_user_cache(sender, instance, **kwargs):
+    key = USER_CACHE_VERSION_KEY.format(instance.pk)
+    transaction.on_commit(lambda: bump_cache_version(key))
@@ -1,5 +1,6 @@
 from typing import Any
 
+from django.db.models import Model
 from rest_framework.exceptions import ValidationError
 
 
@@ -28,3 +29,32 @@ def validate_amount(value: list, error_message: str):
                 detail=error_message,
                 code=400
             )
+
+
+def validate_existing_ids(model: Model, value: list, error_message: str):
+    existing_ids = model.objects.filter(
+        pk__in=value
+    ).values_list('pk', flat=True)
+    if len(set(existing_ids)) != len(set(value)):
+        raise ValidationError(
+            detail=error_message,
+            code=400
+        )
+
+
+def validate_limit(value: Any, max_limit: int, error_message: str):
+    if value is None:
+        return None
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValidationError(
+            detail=error_message,
+            code=400
+        )
+    if limit < 0:
+        raise ValidationError(
+            detail=error_message,
+            code=400
+        )
+    return min(limit, max_limit)
@@ -1,28 +1,39 @@
+import csv
+import json
 from typing import Union
 
 from django.db.models import Sum
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import (GenericViewSet, ModelViewSet,
                                      ReadOnlyModelViewSet, mixins)
 
-from api.filters import IngredientFilter, RecipeFilter
-from api.pagination import CustomPagination
+from api.cache import (INGREDIENT_CACHE_VERSION_KEY, TAG_CACHE_VERSION_KEY,
+                       CachedResponseMixin)
+from api.constants import (MAX_INGREDIENTS_LIMIT, MAX_RECIPES_LIMIT,
+                           SHOPPING_LIST_CHUNK_SIZE)
+from api.filters import RecipeFilter
+from api.pagination import CustomPagination, FeedPagination
+from api.parsers import JSONFieldsMultiPartParser
 from api.permissions import IsAuthroOrAuthenticatedOrReadOnly
+from api.search import ingredient_index
 from api.serializers import (CustomUserCreateSerializer,
                              CustomUserRetrieveSerializer, FavouriteSerializer,
                              IngredientSerializer, RecipeCreateSerializer,
                              RecipeRetrieveSerializer,
                              RecipeSubscriptionSerializer,
-                             ShoppingCartSerializer, SubscriptionSerializer,
-                             TagSerializer)
-from recipes.models import (Ingredient, Recipe, RecipeFavourite,
+                             ShoppingCartSerializer,
+                             SubscriptionRetrieveSerializer,
+                             SubscriptionSerializer, TagSerializer)
+from api.validators import validate_limit
+from recipes.models import (FeedEntry, Ingredient, Recipe, RecipeFavourite,
                             RecipeIngredient, ShoppingCart, Tag)
 from users.models import CustomUser, Subscription
 
@@ -39,6 +50,12 @@ class UserViewSet(GenericViewSet, RetrieveCreateMixin):
     queryset = CustomUser.objects.all()
     permission_classes = (AllowAny, )
     http_method_names = ('get', 'post', 'delete')
+    cursor_ordering = 'email'
+
+    def get_queryset(self):
+        if self.action in ('list', 'retrieve'):
+            return CustomUser.objects.with_is_subscribed(self.request.user)
+        return super().get_queryset()
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
@@ -51,9 +68,19 @@ class UserViewSet(GenericViewSet, RetrieveCreateMixin):
         permission_classes=(IsAuthenticated, ),
     )
     def subscriptions(self, request):
-        queryset = Subscription.objects.filter(user=request.user)
+        try:
+            recipes_limit = get_recipes_limit(request)
+        except ValidationError as error:
+            return Response(
+                data=error.detail,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        queryset = CustomUser.objects.subscriptions(
+            user=request.user,
+            recipes_limit=recipes_limit
+        )
         page = self.paginate_queryset(queryset)
-        serializer = SubscriptionSerializer(
+        serializer = SubscriptionRetrieveSerializer(
             page, many=True, context={'request': request}
         )
         return self.get_paginated_response(serializer.data)
@@ -71,7 +98,10 @@ class UserViewSet(GenericViewSet, RetrieveCreateMixin):
                     'author': author.pk,
                     'user': request.user.pk
                 },
-                context={'request': request}
+                context={
+                    'request': request,
+                    'recipes_limit': get_recipes_limit(request)
+                }
             )
             serializer.is_valid(raise_exception=True)
             serializer.save()
@@ -103,20 +133,43 @@ class UserViewSet(GenericViewSet, RetrieveCreateMixin):
             )
 
 
-class TagViewSet(ReadOnlyModelViewSet):
+class TagViewSet(CachedResponseMixin, ReadOnlyModelViewSet):
+    cache_version_key = TAG_CACHE_VERSION_KEY
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (AllowAny, )
     pagination_class = None
 
 
-class IngredientViewSet(ReadOnlyModelViewSet):
+class IngredientViewSet(CachedResponseMixin, ReadOnlyModelViewSet):
+    cache_version_key = INGREDIENT_CACHE_VERSION_KEY
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = (AllowAny, )
     pagination_class = None
-    filter_backends = (IngredientFilter, )
-    search_fields = ('^name', )
+
+    def list(self, request):
+        return self.cached_response(
+            request, lambda: self.search_ingredients(request)
+        )
+
+    def search_ingredients(self, request):
+        try:
+            limit = validate_limit(
+                request.query_params.get('limit'),
+                MAX_INGREDIENTS_LIMIT,
+                (f'limit должен быть целым числом от 0 '
+                 f'(не больше {MAX_INGREDIENTS_LIMIT})!')
+            )
+        except ValidationError as error:
+            return Response(
+                data=error.detail,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        name = request.query_params.get('name')
+        if name:
+            return Response(ingredient_index.search(name, limit))
+        return Response(ingredient_index.all(limit))
 
 
 class RecipeViewSet(ModelViewSet):
@@ -126,42 +179,75 @@ class RecipeViewSet(ModelViewSet):
     filterset_class = RecipeFilter
     pagination_class = CustomPagination
     http_method_names = ('get', 'post', 'patch', 'delete')
+    parser_classes = (JSONParser, JSONFieldsMultiPartParser)
+    multipart_json_fields = ('ingredients', 'tags')
+    cursor_ordering = '-id'
+
+    def get_queryset(self):
+        if self.action in ('list', 'retrieve'):
+            return Recipe.objects.with_user_flags(self.request.user)
+        return super().get_queryset()
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return RecipeRetrieveSerializer
         return RecipeCreateSerializer
 
+    @action(
+        methods=('get', ),
+        detail=False,
+        permission_classes=(IsAuthenticated, )
+    )
+    def feed(self, request):
+        paginator = FeedPagination()
+        entries = paginator.paginate_queryset(
+            FeedEntry.objects.filter(user=request.user).only('recipe_id'),
+            request,
+            self
+        )
+        recipes = Recipe.objects.with_user_flags(request.user).in_bulk(
+            [entry.recipe_id for entry in entries]
+        )
+        serializer = RecipeRetrieveSerializer(
+            [recipes[entry.recipe_id] for entry in entries
+             if entry.recipe_id in recipes],
+            many=True,
+            context=self.get_serializer_context()
+        )
+        return paginator.get_paginated_response(serializer.data)
+
     @action(
         methods=('get', ),
         detail=False,
         permission_classes=(IsAuthenticated, )
     )
     def download_shopping_cart(self, request):
-        file_name = 'shopping_list'
-        shopping_list = 'Продуктовая корзина:'
+        file_type = request.query_params.get('type', 'txt')
+        if file_type not in SHOPPING_LIST_FORMATS:
+            return Response(
+                data=(f'Неизвестный формат файла! Доступные форматы: '
+                      f'{", ".join(SHOPPING_LIST_FORMATS)}'),
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        content_type, render_rows = SHOPPING_LIST_FORMATS.get(file_type)
 
         ingredients = RecipeIngredient.objects.filter(
             recipe__shopping_cart__user=request.user
         ).values(
             'ingredient__name',
             'ingredient__measurement_unit'
-        ).annotate(amount=Sum('amount'))
+        ).annotate(
+            amount=Sum('amount')
+        ).order_by('ingredient__name', 'ingredient__measurement_unit')
 
-        for index, ingredient in enumerate(ingredients):
-            shopping_list += (
-                f'\n{ingredient.get("ingredient__name")}; '
-                f'{ingredient.get("amount")}; '
-                f'{ingredient.get("ingredient__measurement_unit")}\n'
-            )
-            if index < ingredients.count() - 1:
-                shopping_list += '; '
-
-        response = HttpResponse(
-            shopping_list, 'Content-Type: application/pdf'
+        response = StreamingHttpResponse(
+            render_rows(
+                ingredients.iterator(chunk_size=SHOPPING_LIST_CHUNK_SIZE)
+            ),
+            content_type=content_type
         )
         response['Content-Disposition'] = (
-            f'attachment; filename="{file_name}.pdf"'
+            f'attachment; filename="shopping_list.{file_type}"'
         )
         return response
 
@@ -209,6 +295,15 @@ class RecipeViewSet(ModelViewSet):
         )
 
 
+def get_recipes_limit(request):
+    return validate_limit(
+        request.query_params.get('recipes_limit'),
+        MAX_RECIPES_LIMIT,
+        (f'recipes_limit должен быть целым числом от 0 '
+         f'(не больше {MAX_RECIPES_LIMIT})!')
+    )
+
+
 def create_instance(
     serializer_class: Union[FavouriteSerializer, ShoppingCartSerializer],
     user: CustomUser, pk: int
@@ -251,3 +346,46 @@ def delete_instance(
             data=error_message,
             status=status.HTTP_400_BAD_REQUEST
         )
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def render_txt(ingredients):
+    yield 'Продуктовая корзина:\n'
+    for ingredient in ingredients:
+        yield (f'{ingredient.get("ingredient__name")} '
+               f'({ingredient.get("ingredient__measurement_unit")}) '
+               f'— {ingredient.get("amount")}\n')
+
+
+def render_csv(ingredients):
+    writer = csv.writer(Echo())
+    yield writer.writerow(('name', 'measurement_unit', 'amount'))
+    for ingredient in ingredients:
+        yield writer.writerow((
+            ingredient.get('ingredient__name'),
+            ingredient.get('ingredient__measurement_unit'),
+            ingredient.get('amount')
+        ))
+
+
+def render_json(ingredients):
+    separator = '['
+    for ingredient in ingredients:
+        yield separator + json.dumps({
+            'name': ingredient.get('ingredient__name'),
+            'measurement_unit': ingredient.get('ingredient__measurement_unit'),
+            'amount': ingredient.get('amount')
+        }, ensure_ascii=False)
+        separator = ','
+    yield '[]' if separator == '[' else ']'
+
+
+SHOPPING_LIST_FORMATS = {
+    'txt': ('text/plain; charset=utf-8', render_txt),
+    'csv': ('text/csv; charset=utf-8', render_csv),
+    'json': ('application/json', render_json),
+}
@@ -0,0 +1,32 @@
+from django.db import connections
+from django.http import HttpRequest
+from django.urls import reverse
+
+from api.cache import get_tag_ids_by_slug
+from api.search import ingredient_index
+from api.views import IngredientViewSet, TagViewSet
+
+WARM_UP_VIEWS = (
+    (TagViewSet.as_view({'get': 'list'}), 'tags-list'),
+    (IngredientViewSet.as_view({'get': 'list'}), 'ingredients-list'),
+)
+
+
+def open_connections():
+    for connection in connections.all():
+        connection.ensure_connection()
+
+
+def build_request(path):
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = path
+    return request
+
+
+def warm_up():
+    open_connections()
+    get_tag_ids_by_slug()
+    ingredient_index.get_snapshot()
+    for view, url_name in WARM_UP_VIEWS:
+        view(build_request(reverse(url_name)))
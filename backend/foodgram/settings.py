@@ -29,6 +29,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.DatabaseInstrumentationMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -39,6 +41,44 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'foodgram.urls'
 
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', 'false').lower() == 'true'
+
+DB_INSTRUMENTATION_ENABLED = (
+    os.getenv('DB_INSTRUMENTATION_ENABLED', 'false').lower() == 'true'
+)
+
+DB_INSTRUMENTATION_SLOW_REQUEST_MS = int(
+    os.getenv('DB_INSTRUMENTATION_SLOW_REQUEST_MS', 500)
+)
+
+DB_INSTRUMENTATION_SLOWEST_QUERIES = int(
+    os.getenv('DB_INSTRUMENTATION_SLOWEST_QUERIES', 3)
+)
+
+DB_INSTRUMENTATION_LOG_SAMPLE_RATE = float(
+    os.getenv('DB_INSTRUMENTATION_LOG_SAMPLE_RATE', 1.0)
+)
+
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(
+    os.getenv('ADMIN_ESTIMATED_COUNT_THRESHOLD', 100000)
+)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -64,6 +104,31 @@ DBSQLITE = {
     }
 }
 
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', 60))
+
+DB_CONN_HEALTH_CHECKS = (
+    os.getenv('DB_CONN_HEALTH_CHECKS', 'true').lower() == 'true'
+)
+
+DB_MAX_CONNECTIONS = int(os.getenv('DB_MAX_CONNECTIONS', 80))
+
+DB_POOL_ENABLED = os.getenv('DB_POOL_ENABLED', 'false').lower() == 'true'
+
+DB_POOL_MAX_SIZE = int(os.getenv(
+    'DB_POOL_MAX_SIZE',
+    max(1, DB_MAX_CONNECTIONS // int(os.getenv('GUNICORN_WORKERS', 1)))
+))
+
+DB_POOL_MIN_SIZE = int(
+    os.getenv('DB_POOL_MIN_SIZE', min(2, DB_POOL_MAX_SIZE))
+)
+
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))
+
+DB_POOL_MAX_IDLE = float(os.getenv('DB_POOL_MAX_IDLE', 600))
+
+DB_POOL_MAX_LIFETIME = float(os.getenv('DB_POOL_MAX_LIFETIME', 3600))
+
 DBPOSTGRES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -72,17 +137,66 @@ DBPOSTGRES = {
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
         'HOST': os.getenv('DB_HOST', 'db'),
         'PORT': os.getenv('DB_PORT', 5432),
+        'CONN_MAX_AGE': 0 if DB_POOL_ENABLED else DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
+        'OPTIONS': {
+            'pool': {
+                'min_size': DB_POOL_MIN_SIZE,
+                'max_size': DB_POOL_MAX_SIZE,
+                'timeout': DB_POOL_TIMEOUT,
+                'max_idle': DB_POOL_MAX_IDLE,
+                'max_lifetime': DB_POOL_MAX_LIFETIME,
+            },
+        } if DB_POOL_ENABLED else {},
     }
 }
 
 DATABASES = DBSQLITE if DEBUG else DBPOSTGRES
 
+DB_REPLICAS = os.getenv('DB_REPLICAS', '').split()
+
+DB_REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', 15))
+
+DB_REPLICA_ALIASES = [
+    f'replica_{index}' for index in range(1, len(DB_REPLICAS) + 1)
+]
+
+DATABASES.update({
+    alias: {
+        **DATABASES['default'],
+        ('NAME' if DEBUG else 'HOST'): replica,
+        'TEST': {'MIRROR': 'default'},
+    }
+    for alias, replica in zip(DB_REPLICA_ALIASES, DB_REPLICAS)
+})
+
+DATABASE_ROUTERS = ['foodgram.routers.ReplicaRouter']
+
+REDIS_URL = os.getenv('REDIS_URL')
+
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 50000))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+        'KEY_PREFIX': 'foodgram',
+    } if REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': CACHE_MAX_ENTRIES},
+    }
+}
+
+CACHE_VERSION_TIMEOUT = (
+    None if REDIS_URL else int(os.getenv('CACHE_VERSION_TIMEOUT', 30))
+)
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.DenylistJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'api.pagination.CustomPagination',
     'PAGE_SIZE': 6,
@@ -124,6 +238,20 @@ MEDIA_URL = '/media/'
 
 MEDIA_ROOT = '/media/'
 
+IMAGE_MAX_UPLOAD_SIZE = int(
+    os.getenv('IMAGE_MAX_UPLOAD_SIZE', 10 * 1024 * 1024)
+)
+
+IMAGE_MAX_PIXELS = int(os.getenv('IMAGE_MAX_PIXELS', 40_000_000))
+
+IMAGE_MAX_DIMENSION = int(os.getenv('IMAGE_MAX_DIMENSION', 1920))
+
+IMAGE_FORMAT = os.getenv('IMAGE_FORMAT', 'WEBP')
+
+IMAGE_QUALITY = int(os.getenv('IMAGE_QUALITY', 80))
+
+IMAGE_PROCESSING_WORKERS = int(os.getenv('IMAGE_PROCESSING_WORKERS', 2))
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'users.CustomUser'
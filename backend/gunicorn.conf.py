@@ -0,0 +1,139 @@
+import math
+import os
+import threading
+from concurrent.futures import wait
+
+CGROUP_CPU_QUOTA_FILES = (
+    ('/sys/fs/cgroup/cpu.max', None),
+    ('/sys/fs/cgroup/cpu/cpu.cfs_quota_us',
+     '/sys/fs/cgroup/cpu/cpu.cfs_period_us'),
+)
+
+
+def read_cpu_quota():
+    for quota_file, period_file in CGROUP_CPU_QUOTA_FILES:
+        try:
+            with open(quota_file) as file:
+                values = file.read().split()
+            if period_file is not None:
+                with open(period_file) as file:
+                    values.extend(file.read().split())
+        except OSError:
+            continue
+        quota, period = values[:2]
+        if quota in ('max', '-1'):
+            return None
+        return max(1, math.ceil(int(quota) / int(period)))
+    return None
+
+
+def get_cpu_count():
+    if hasattr(os, 'sched_getaffinity'):
+        available = len(os.sched_getaffinity(0))
+    else:
+        available = os.cpu_count() or 1
+    quota = read_cpu_quota()
+    return min(available, quota) if quota else available
+
+
+CPU_COUNT = get_cpu_count()
+
+DB_MAX_CONNECTIONS = int(os.getenv('DB_MAX_CONNECTIONS', 80))
+
+DB_POOL_ENABLED = os.getenv('DB_POOL_ENABLED', 'false').lower() == 'true'
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+workers = int(os.getenv(
+    'GUNICORN_WORKERS',
+    CPU_COUNT + 1 if DB_POOL_ENABLED
+    else max(1, min(CPU_COUNT + 1, DB_MAX_CONNECTIONS // threads))
+))
+
+os.environ.setdefault('GUNICORN_WORKERS', str(workers))
+
+worker_class = os.getenv(
+    'GUNICORN_WORKER_CLASS', 'gthread' if threads > 1 else 'sync'
+)
+
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+
+WARM_UP_TIMEOUT = int(os.getenv('GUNICORN_WARM_UP_TIMEOUT', 30))
+
+
+def when_ready(server):
+    if not DB_POOL_ENABLED and workers * threads > DB_MAX_CONNECTIONS:
+        server.log.warning(
+            'Постоянные соединения: до %s соединений с БД при лимите %s, '
+            'уменьшите число воркеров или потоков либо включите '
+            'DB_POOL_ENABLED', workers * threads, DB_MAX_CONNECTIONS
+        )
+
+
+def pre_fork(server, worker):
+    if not server.cfg.preload_app:
+        return
+    from api.db import close_pools
+
+    close_pools()
+
+
+def warm_up_thread(barrier):
+    from api.warmup import open_connections
+
+    open_connections()
+    barrier.wait(WARM_UP_TIMEOUT)
+
+
+def warm_up_threads(worker, thread_pool):
+    barrier = threading.Barrier(worker.cfg.threads)
+    done, _ = wait(
+        [thread_pool.submit(warm_up_thread, barrier)
+         for _ in range(worker.cfg.threads)],
+        WARM_UP_TIMEOUT
+    )
+    for future in done:
+        if future.exception() is not None:
+            worker.log.warning('Прогрев потока не выполнен: %s',
+                               future.exception())
+
+
+def post_worker_init(worker):
+    from django.db import connections
+
+    from api.warmup import warm_up
+
+    try:
+        warm_up()
+        thread_pool = getattr(worker, 'tpool', None)
+        if thread_pool is not None:
+            connections.close_all()
+            if not DB_POOL_ENABLED:
+                warm_up_threads(worker, thread_pool)
+    except Exception:
+        worker.log.exception('Прогрев воркера %s не выполнен', worker.pid)
+        connections.close_all()
+        return
+    worker.log.info('Воркер %s прогрет', worker.pid)
+
+
+def worker_exit(server, worker):
+    from api.db import get_pool_stats
+
+    for alias, stats in get_pool_stats().items():
+        worker.log.info('Пул соединений %s воркера %s: %s',
+                        alias, worker.pid, stats)
@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from foodgram.paginators import EstimatedCountPaginator
 from recipes.models import (Ingredient, Recipe, RecipeFavourite, ShoppingCart,
                             Tag)
 
@@ -8,6 +9,13 @@ EMPTY_MESSAGE = 'Незаполненное поле'
 
 class IngredientsInLine(admin.TabularInline):
     model = Recipe.ingredients.through
+    autocomplete_fields = ('ingredient', )
+    extra = 1
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            'ingredient', 'recipe__author'
+        )
 
 
 @admin.register(Tag)
@@ -30,6 +38,8 @@ class IngredientAdmin(admin.ModelAdmin):
         'measurement_unit'
     )
     search_fields = ('name', )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = EMPTY_MESSAGE
 
 
@@ -39,19 +49,20 @@ class RecipeAdmin(admin.ModelAdmin):
         'id',
         'name',
         'author',
-        'count_favorites'
+        'favorites_count'
     )
     list_filter = ('tags', )
     search_fields = (
         'name',
         'author__username'
     )
+    list_select_related = ('author', )
+    autocomplete_fields = ('author', )
     inlines = (IngredientsInLine, )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = EMPTY_MESSAGE
 
-    def count_favorites(self, obj):
-        return obj.favorites.count()
-
 
 @admin.register(RecipeFavourite)
 class FavoriteAdmin(admin.ModelAdmin):
@@ -64,6 +75,10 @@ class FavoriteAdmin(admin.ModelAdmin):
         'user__username',
         'user__email'
     )
+    list_select_related = ('user', 'recipe__author')
+    autocomplete_fields = ('user', 'recipe')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = EMPTY_MESSAGE
 
 
@@ -78,4 +93,8 @@ class ShoppingCartAdmin(admin.ModelAdmin):
         'user__username',
         'user__email'
     )
+    list_select_related = ('user', 'recipe__author')
+    autocomplete_fields = ('user', 'recipe')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = EMPTY_MESSAGE
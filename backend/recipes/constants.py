@@ -12,10 +12,18 @@ MAX_AMOUNT_OF_PRODUCTS = 100
 
 MIN_AMOUNT_OF_PRODUCTS = 1
 
+SEARCH_CONFIG = 'russian'
+
+SEARCH_FTS_TABLE = 'recipes_recipe_fts'
+
+FEED_BACKFILL_LIMIT = 100
+
 HELP_TEXT = {
     'tag_color': 'Цвет тэга',
     'tag_slug': 'Уникальный идентификатор тэга',
-    'measurement_unit': 'Единица измерения ингредиента'
+    'measurement_unit': 'Единица измерения ингредиента',
+    'favorites_count': ('Число добавлений рецепта в избранное. '
+                        'Обновляется автоматически')
 }
 
 MIN_COOKING_TIME_ERROR = (f'Время приготовления блюда не может быть меньше '
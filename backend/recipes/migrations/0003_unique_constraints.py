@@ -0,0 +1,134 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:36
+
+from django.conf import settings
+from django.db import migrations, models, transaction
+
+BATCH_SIZE = 1000
+
+
+def delete_duplicates(model, fields, sum_field=None):
+    aggregates = {'keep_id': models.Min('id'), 'rows': models.Count('id')}
+    if sum_field is not None:
+        aggregates['total'] = models.Sum(sum_field)
+    duplicates = model.objects.values(*fields).annotate(
+        **aggregates
+    ).filter(rows__gt=1).order_by()
+    for group in duplicates.iterator():
+        lookup = {field: group.get(field) for field in fields}
+        duplicate_ids = list(
+            model.objects.filter(**lookup).exclude(
+                id=group.get('keep_id')
+            ).values_list('id', flat=True)
+        )
+        with transaction.atomic():
+            if sum_field is not None:
+                model.objects.filter(id=group.get('keep_id')).update(
+                    **{sum_field: group.get('total')}
+                )
+            for start in range(0, len(duplicate_ids), BATCH_SIZE):
+                model.objects.filter(
+                    id__in=duplicate_ids[start:start + BATCH_SIZE]
+                ).delete()
+
+
+def remove_duplicates(apps, schema_editor):
+    delete_duplicates(
+        apps.get_model('recipes', 'RecipeFavourite'), ('user', 'recipe')
+    )
+    delete_duplicates(
+        apps.get_model('recipes', 'ShoppingCart'), ('user', 'recipe')
+    )
+    delete_duplicates(
+        apps.get_model('recipes', 'RecipeIngredient'),
+        ('recipe', 'ingredient'),
+        sum_field='amount'
+    )
+
+
+def rename_duplicate_slugs(apps, schema_editor):
+    Tag = apps.get_model('recipes', 'Tag')
+    duplicates = Tag.objects.values('slug').annotate(
+        keep_id=models.Min('id'), rows=models.Count('id')
+    ).filter(rows__gt=1).order_by()
+    for group in duplicates:
+        for tag in Tag.objects.filter(slug=group.get('slug')).exclude(
+            id=group.get('keep_id')
+        ):
+            suffix = f'-{tag.id}'
+            tag.slug = tag.slug[:200 - len(suffix)] + suffix
+            tag.save(update_fields=('slug', ))
+
+
+def add_unique_constraint(model_name, constraint):
+    def forward(apps, schema_editor):
+        model = apps.get_model('recipes', model_name)
+        if schema_editor.connection.vendor != 'postgresql':
+            schema_editor.execute(
+                constraint.create_sql(model, schema_editor)
+            )
+            return
+        table = schema_editor.quote_name(model._meta.db_table)
+        name = schema_editor.quote_name(constraint.name)
+        columns = ', '.join(
+            schema_editor.quote_name(model._meta.get_field(field).column)
+            for field in constraint.fields
+        )
+        schema_editor.execute(
+            f'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {name} '
+            f'ON {table} ({columns})'
+        )
+        schema_editor.execute(
+            f'ALTER TABLE {table} ADD CONSTRAINT {name} '
+            f'UNIQUE USING INDEX {name}'
+        )
+
+    def backward(apps, schema_editor):
+        schema_editor.execute(constraint.remove_sql(
+            apps.get_model('recipes', model_name), schema_editor
+        ))
+
+    return migrations.SeparateDatabaseAndState(
+        database_operations=(
+            migrations.RunPython(forward, backward),
+        ),
+        state_operations=(
+            migrations.AddConstraint(
+                model_name=model_name,
+                constraint=constraint
+            ),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('recipes', '0002_alter_recipefavourite_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.RunPython(
+            rename_duplicate_slugs, migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name='tag',
+            name='slug',
+            field=models.SlugField(help_text='Уникальный идентификатор тэга', max_length=200, unique=True, verbose_name='Слаг'),
+        ),
+        add_unique_constraint(
+            'recipefavourite',
+            models.UniqueConstraint(fields=('user', 'recipe'), name='unique_favourite_user_recipe'),
+        ),
+        add_unique_constraint(
+            'recipeingredient',
+            models.UniqueConstraint(fields=('recipe', 'ingredient'), name='unique_recipe_ingredient'),
+        ),
+        add_unique_constraint(
+            'shoppingcart',
+            models.UniqueConstraint(fields=('user', 'recipe'), name='unique_shopping_cart_user_recipe'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+INDEX = models.Index(
+    fields=('tag', 'recipe'),
+    name='recipe_tag_tag_recipe_idx'
+)
+
+
+def concurrently(schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        return {'concurrently': True}
+    return {}
+
+
+def add_index(apps, schema_editor):
+    schema_editor.add_index(
+        apps.get_model('recipes', 'RecipeTag'), INDEX,
+        **concurrently(schema_editor)
+    )
+
+
+def remove_index(apps, schema_editor):
+    schema_editor.remove_index(
+        apps.get_model('recipes', 'RecipeTag'), INDEX,
+        **concurrently(schema_editor)
+    )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('recipes', '0005_recipe_search'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=(
+                migrations.RunPython(add_index, remove_index),
+            ),
+            state_operations=(
+                migrations.AddIndex(model_name='recipetag', index=INDEX),
+            )
+        ),
+    ]
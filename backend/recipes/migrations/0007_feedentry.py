@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+FEED_BACKFILL_LIMIT = 100
+
+
+def fill_feed(apps, schema_editor):
+    schema_editor.execute(
+        'INSERT INTO recipes_feedentry (user_id, recipe_id, author_id) '
+        'SELECT subscription.user_id, recipe.id, recipe.author_id '
+        'FROM users_subscription subscription '
+        'INNER JOIN (SELECT id, author_id, ROW_NUMBER() OVER '
+        '(PARTITION BY author_id ORDER BY id DESC) AS position '
+        'FROM recipes_recipe) recipe '
+        'ON recipe.author_id = subscription.author_id '
+        'WHERE recipe.position <= %s',
+        (FEED_BACKFILL_LIMIT, )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_recipetag_tag_recipe_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор рецепта')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to='recipes.recipe', verbose_name='Рецепт')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Запись ленты',
+                'verbose_name_plural': 'Записи ленты',
+                'indexes': [models.Index(fields=['user', 'author'], name='feed_entry_user_author_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'recipe'), name='unique_feed_entry_user_recipe')],
+            },
+        ),
+        migrations.RunPython(fill_feed, migrations.RunPython.noop),
+    ]
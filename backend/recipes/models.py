@@ -1,14 +1,20 @@
+import re
+
 from colorfield.fields import ColorField
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVectorField)
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import connections, models, transaction
 
-from recipes.constants import (HELP_TEXT, MAX_AMOUNT_ERROR,
-                               MAX_AMOUNT_OF_PRODUCTS, MAX_CHARFIELD_LENGTH,
-                               MAX_COLORFIELD_LENGTH, MAX_COOKING_TIME,
-                               MAX_COOKING_TIME_ERROR, MAX_TEXTFIELD_LENGTH,
-                               MIN_AMOUNT_ERROR, MIN_AMOUNT_OF_PRODUCTS,
-                               MIN_COOKING_TIME, MIN_COOKING_TIME_ERROR)
-from users.models import CustomUser
+from recipes.constants import (FEED_BACKFILL_LIMIT, HELP_TEXT,
+                               MAX_AMOUNT_ERROR, MAX_AMOUNT_OF_PRODUCTS,
+                               MAX_CHARFIELD_LENGTH, MAX_COLORFIELD_LENGTH,
+                               MAX_COOKING_TIME, MAX_COOKING_TIME_ERROR,
+                               MAX_TEXTFIELD_LENGTH, MIN_AMOUNT_ERROR,
+                               MIN_AMOUNT_OF_PRODUCTS, MIN_COOKING_TIME,
+                               MIN_COOKING_TIME_ERROR, SEARCH_CONFIG,
+                               SEARCH_FTS_TABLE)
+from users.models import CustomUser, Subscription
 
 
 class Tag(models.Model):
@@ -26,7 +32,8 @@ class Tag(models.Model):
     slug = models.SlugField(
         verbose_name='Слаг',
         help_text=HELP_TEXT.get('tag_slug'),
-        max_length=MAX_CHARFIELD_LENGTH
+        max_length=MAX_CHARFIELD_LENGTH,
+        unique=True
     )
 
     class Meta:
@@ -65,6 +72,82 @@ class Ingredient(models.Model):
         return f'Ингредиент: {self.name} ({self.measurement_unit})'
 
 
+class RecipeQuerySet(models.QuerySet):
+    def search(self, query):
+        vendor = connections[self.db].vendor
+        if vendor == 'postgresql':
+            search_query = SearchQuery(
+                query, config=SEARCH_CONFIG, search_type='websearch'
+            )
+            return self.alias(
+                search_vector=models.expressions.RawSQL(
+                    f'{Recipe._meta.db_table}.search_vector', (),
+                    output_field=SearchVectorField()
+                )
+            ).filter(search_vector=search_query).annotate(
+                search_rank=SearchRank('search_vector', search_query)
+            ).order_by('-search_rank', '-pk')
+        if vendor == 'sqlite':
+            terms = re.findall(r'\w+', query)
+            if not terms:
+                return self.none()
+            match = ' '.join(f'"{term}"*' for term in terms)
+            return self.filter(
+                pk__in=models.expressions.RawSQL(
+                    f'SELECT rowid FROM {SEARCH_FTS_TABLE} '
+                    f'WHERE {SEARCH_FTS_TABLE} MATCH %s',
+                    (match, )
+                )
+            ).annotate(
+                search_rank=models.expressions.RawSQL(
+                    f'SELECT -bm25({SEARCH_FTS_TABLE}) '
+                    f'FROM {SEARCH_FTS_TABLE} '
+                    f'WHERE {SEARCH_FTS_TABLE} MATCH %s '
+                    f'AND rowid = {Recipe._meta.db_table}.id',
+                    (match, ),
+                    output_field=models.FloatField()
+                )
+            ).order_by('-search_rank', '-pk')
+        return self.filter(
+            models.Q(name__icontains=query) | models.Q(text__icontains=query)
+        )
+
+    def with_related(self):
+        return self.prefetch_related(
+            'tags',
+            models.Prefetch(
+                'recipe_ingredients',
+                queryset=RecipeIngredient.objects.select_related('ingredient')
+            )
+        )
+
+    def with_user_flags(self, user):
+        if user is None or user.is_anonymous:
+            return self.with_related().select_related('author').annotate(
+                is_favorited=models.Value(False),
+                is_in_shopping_cart=models.Value(False)
+            )
+        return self.with_related().prefetch_related(
+            models.Prefetch(
+                'author',
+                queryset=CustomUser.objects.with_is_subscribed(user)
+            )
+        ).annotate(
+            is_favorited=models.Exists(
+                RecipeFavourite.objects.filter(
+                    recipe=models.OuterRef('pk'),
+                    user=user
+                )
+            ),
+            is_in_shopping_cart=models.Exists(
+                ShoppingCart.objects.filter(
+                    recipe=models.OuterRef('pk'),
+                    user=user
+                )
+            )
+        )
+
+
 class Recipe(models.Model):
     name = models.CharField(
         verbose_name='Название',
@@ -118,6 +201,15 @@ class Recipe(models.Model):
         related_name='recipes'
     )
 
+    favorites_count = models.PositiveIntegerField(
+        verbose_name='Добавлений в избранное',
+        help_text=HELP_TEXT.get('favorites_count'),
+        default=0,
+        editable=False
+    )
+
+    objects = RecipeQuerySet.as_manager()
+
     class Meta:
         ordering = ('name', )
         verbose_name = 'Рецепт'
@@ -145,6 +237,12 @@ class RecipeTag(models.Model):
         ordering = ('recipe', )
         verbose_name = 'Тэг рецепта'
         verbose_name_plural = 'Тэги рецептов'
+        indexes = (
+            models.Index(
+                fields=('tag', 'recipe'),
+                name='recipe_tag_tag_recipe_idx'
+            ),
+        )
 
     def __str__(self) -> str:
         return f'Тэг {self.tag} рецепта {self.recipe}'
@@ -183,6 +281,12 @@ class RecipeIngredient(models.Model):
         ordering = ('recipe', )
         verbose_name = 'Ингредиент рецепта'
         verbose_name_plural = 'Ингредиенты рецептов'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('recipe', 'ingredient'),
+                name='unique_recipe_ingredient'
+            ),
+        )
 
     def __str__(self) -> str:
         return (f'Ингредиент {self.ingredient} '
@@ -213,6 +317,12 @@ class RecipeFavourite(BaseRecipe):
         verbose_name = 'Избранное'
         verbose_name_plural = 'Избранные'
         default_related_name = 'favorites'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'recipe'),
+                name='unique_favourite_user_recipe'
+            ),
+        )
 
     def __str__(self) -> str:
         return (f'Избранный рецепт {self.recipe}'
@@ -225,7 +335,114 @@ class ShoppingCart(BaseRecipe):
         verbose_name = 'Корзина'
         verbose_name_plural = 'Корзины'
         default_related_name = 'shopping_cart'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'recipe'),
+                name='unique_shopping_cart_user_recipe'
+            ),
+        )
 
     def __str__(self) -> str:
         return (f'Рецепт {self.recipe} продуктовой корзины'
                 f'пользователя {self.user}')
+
+
+class FeedEntryQuerySet(models.QuerySet):
+    def insert_from_select(self, select, params):
+        table = self.model._meta.db_table
+        self._for_write = True
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} (user_id, recipe_id, author_id) '
+                f'{select} ON CONFLICT DO NOTHING',
+                params
+            )
+
+    def fan_out(self, recipe):
+        self.insert_from_select(
+            f'SELECT user_id, %s, author_id '
+            f'FROM {Subscription._meta.db_table} WHERE author_id = %s',
+            (recipe.pk, recipe.author_id)
+        )
+
+    def backfill(self, user_id, author_id, limit=FEED_BACKFILL_LIMIT):
+        self.insert_from_select(
+            f'SELECT %s, id, author_id FROM {Recipe._meta.db_table} '
+            f'WHERE author_id = %s ORDER BY id DESC LIMIT %s',
+            (user_id, author_id, limit)
+        )
+
+    def trim(self, user_id, author_id):
+        return self.filter(user_id=user_id, author_id=author_id).delete()
+
+    def rebuild_user(self, user_id, limit=FEED_BACKFILL_LIMIT):
+        self._for_write = True
+        with transaction.atomic(using=self.db):
+            self.filter(user_id=user_id).delete()
+            self.insert_from_select(
+                f'SELECT %s, recipe.id, recipe.author_id '
+                f'FROM (SELECT id, author_id, ROW_NUMBER() OVER '
+                f'(PARTITION BY author_id ORDER BY id DESC) AS position '
+                f'FROM {Recipe._meta.db_table} WHERE author_id IN '
+                f'(SELECT author_id FROM {Subscription._meta.db_table} '
+                f'WHERE user_id = %s)) recipe '
+                f'WHERE recipe.position <= %s',
+                (user_id, user_id, limit)
+            )
+
+    def fill(self, limit=FEED_BACKFILL_LIMIT):
+        self.insert_from_select(
+            f'SELECT subscription.user_id, recipe.id, recipe.author_id '
+            f'FROM {Subscription._meta.db_table} subscription '
+            f'INNER JOIN (SELECT id, author_id, ROW_NUMBER() OVER '
+            f'(PARTITION BY author_id ORDER BY id DESC) AS position '
+            f'FROM {Recipe._meta.db_table}) recipe '
+            f'ON recipe.author_id = subscription.author_id '
+            f'WHERE recipe.position <= %s '
+            f'ORDER BY subscription.user_id, recipe.id',
+            (limit, )
+        )
+
+
+class FeedEntry(models.Model):
+    user = models.ForeignKey(
+        verbose_name='Пользователь',
+        to=CustomUser,
+        on_delete=models.CASCADE,
+        related_name='feed'
+    )
+
+    recipe = models.ForeignKey(
+        verbose_name='Рецепт',
+        to=Recipe,
+        on_delete=models.CASCADE,
+        related_name='feed_entries'
+    )
+
+    author = models.ForeignKey(
+        verbose_name='Автор рецепта',
+        to=CustomUser,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+
+    objects = FeedEntryQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'recipe'),
+                name='unique_feed_entry_user_recipe'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', 'author'),
+                name='feed_entry_user_author_idx'
+            ),
+        )
+
+    def __str__(self) -> str:
+        return f'Рецепт {self.recipe} в ленте пользователя {self.user}'
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
+from foodgram.paginators import EstimatedCountPaginator
 from users.models import CustomUser, Subscription
 
 EMPTY_MESSAGE = 'Незаполненное поле'
@@ -13,26 +14,22 @@ class UserAdmin(UserAdmin):
         'email',
         'first_name',
         'last_name',
-        'count_subscribers',
-        'count_recipes'
+        'subscribers_count',
+        'recipes_count'
     )
     list_filter = (
-        'username',
-        'email'
+        'is_staff',
+        'is_active'
     )
     search_fields = (
         'username',
         'email'
     )
     ordering = ('username', )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = EMPTY_MESSAGE
 
-    def count_subscribers(self, obj):
-        return obj.subscriber.count()
-
-    def count_recipes(self, obj):
-        return obj.recipes.count()
-
 
 @admin.register(Subscription)
 class SubscriptionAdmin(admin.ModelAdmin):
@@ -40,14 +37,14 @@ class SubscriptionAdmin(admin.ModelAdmin):
         'user',
         'author'
     )
-    list_filter = (
-        'author__username',
-        'user__username'
-    )
     search_fields = (
         'author__username',
         'author__email',
         'user__username',
         'user__email'
     )
+    list_select_related = ('user', 'author')
+    autocomplete_fields = ('user', 'author')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = EMPTY_MESSAGE
@@ -0,0 +1,16 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from users.denylist import token_denylist
+
+
+class DenylistJWTAuthentication(JWTAuthentication):
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if token_denylist.is_revoked(
+            validated_token.get(api_settings.JTI_CLAIM)
+        ):
+            raise InvalidToken('Токен был отозван!')
+        return validated_token
@@ -2,13 +2,20 @@ MAX_EMAILFIELD_LENGTH = 254
 
 MAX_CHARFIELD_LENGTH = 150
 
-MAX_SIZE_OF_JWT = 228
+MAX_JTI_LENGTH = 255
 
 HELP_TEXT = {
     'email': ('Адрес электронной почты, '
               'использующийся как логин для авторизации'),
     'username': 'Уникальный логин пользователя',
     'password': 'Пароль пользователя, использующийся для авторизации',
-    'value': ('Значение токена, у которого истёк срок годности. '
-              'Такие токены больше не могут использоваться для аутентификации')
+    'jti': ('Идентификатор отозванного токена. '
+            'Такие токены больше не могут использоваться для аутентификации'),
+    'expires_at': ('Время истечения токена. После него запись '
+                   'об отзыве можно удалить'),
+    'recipes_count': 'Число рецептов автора. Обновляется автоматически',
+    'subscribers_count': ('Число подписчиков пользователя. '
+                          'Обновляется автоматически')
 }
+
+DENYLIST_REFRESH_INTERVAL = 1.0
@@ -0,0 +1,113 @@
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from hashlib import blake2b
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Max
+from django.utils import timezone as django_timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from users.constants import DENYLIST_REFRESH_INTERVAL
+from users.models import ExpiredToken
+
+BLOOM_FALSE_POSITIVE_RATE = 0.01
+
+BLOOM_MIN_CAPACITY = 1024
+
+
+class BloomFilter:
+
+    def __init__(self, capacity: int,
+                 false_positive_rate: float = BLOOM_FALSE_POSITIVE_RATE):
+        capacity = max(capacity, BLOOM_MIN_CAPACITY)
+        self.size = math.ceil(
+            -capacity * math.log(false_positive_rate) / math.log(2) ** 2
+        )
+        self.hash_count = max(
+            round(self.size / capacity * math.log(2)), 1
+        )
+        self.bits = bytearray(math.ceil(self.size / 8))
+
+    def get_positions(self, value: str):
+        digest = blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        for index in range(self.hash_count):
+            yield (first + index * second) % self.size
+
+    def add(self, value: str):
+        for position in self.get_positions(value):
+            self.bits[position // 8] |= 1 << (position % 8)
+
+    def __contains__(self, value: str) -> bool:
+        return all(
+            self.bits[position // 8] & (1 << (position % 8))
+            for position in self.get_positions(value)
+        )
+
+
+class TokenDenylist:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = None
+        self._bloom = BloomFilter(BLOOM_MIN_CAPACITY)
+
+    @staticmethod
+    def get_queryset():
+        return ExpiredToken.objects.using(DEFAULT_DB_ALIAS)
+
+    def is_fresh(self) -> bool:
+        return (
+            self._checked_at is not None
+            and time.monotonic() - self._checked_at
+            < DENYLIST_REFRESH_INTERVAL
+        )
+
+    def refresh(self):
+        if self.is_fresh():
+            return
+        with self._lock:
+            if self.is_fresh():
+                return
+            version = self.get_queryset().aggregate(
+                version=Max('pk')
+            ).get('version')
+            if self._version != version:
+                jtis = list(self.get_queryset().filter(
+                    expires_at__gt=django_timezone.now()
+                ).values_list('jti', flat=True))
+                bloom = BloomFilter(len(jtis) * 2)
+                for jti in jtis:
+                    bloom.add(jti)
+                self._bloom = bloom
+                self._version = version
+            self._checked_at = time.monotonic()
+
+    def is_revoked(self, jti: str) -> bool:
+        self.refresh()
+        if jti not in self._bloom:
+            return False
+        return self.get_queryset().filter(jti=jti).exists()
+
+    def revoke(self, token, user):
+        ExpiredToken.objects.filter(
+            expires_at__lte=django_timezone.now()
+        ).delete()
+        jti = token.get(api_settings.JTI_CLAIM)
+        ExpiredToken.objects.get_or_create(
+            jti=jti,
+            defaults={
+                'user': user,
+                'expires_at': datetime.fromtimestamp(
+                    token.get('exp'), tz=timezone.utc
+                )
+            }
+        )
+        self._bloom.add(jti)
+
+
+token_denylist = TokenDenylist()
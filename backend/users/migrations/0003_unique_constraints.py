@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:36
+
+from django.db import migrations, models, transaction
+
+BATCH_SIZE = 1000
+
+CONSTRAINT = models.UniqueConstraint(
+    fields=('user', 'author'),
+    name='unique_subscription_user_author'
+)
+
+
+def remove_duplicates(apps, schema_editor):
+    Subscription = apps.get_model('users', 'Subscription')
+    duplicates = Subscription.objects.values('user', 'author').annotate(
+        keep_id=models.Min('id'), rows=models.Count('id')
+    ).filter(rows__gt=1).order_by()
+    for group in duplicates.iterator():
+        duplicate_ids = list(
+            Subscription.objects.filter(
+                user=group.get('user'),
+                author=group.get('author')
+            ).exclude(
+                id=group.get('keep_id')
+            ).values_list('id', flat=True)
+        )
+        with transaction.atomic():
+            for start in range(0, len(duplicate_ids), BATCH_SIZE):
+                Subscription.objects.filter(
+                    id__in=duplicate_ids[start:start + BATCH_SIZE]
+                ).delete()
+
+
+def add_unique_constraint(apps, schema_editor):
+    Subscription = apps.get_model('users', 'Subscription')
+    if schema_editor.connection.vendor != 'postgresql':
+        schema_editor.execute(
+            CONSTRAINT.create_sql(Subscription, schema_editor)
+        )
+        return
+    table = schema_editor.quote_name(Subscription._meta.db_table)
+    name = schema_editor.quote_name(CONSTRAINT.name)
+    schema_editor.execute(
+        f'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {name} '
+        f'ON {table} (user_id, author_id)'
+    )
+    schema_editor.execute(
+        f'ALTER TABLE {table} ADD CONSTRAINT {name} '
+        f'UNIQUE USING INDEX {name}'
+    )
+
+
+def remove_unique_constraint(apps, schema_editor):
+    schema_editor.execute(CONSTRAINT.remove_sql(
+        apps.get_model('users', 'Subscription'), schema_editor
+    ))
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('users', '0002_customuser_managers'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.SeparateDatabaseAndState(
+            database_operations=(
+                migrations.RunPython(
+                    add_unique_constraint, remove_unique_constraint
+                ),
+            ),
+            state_operations=(
+                migrations.AddConstraint(
+                    model_name='subscription',
+                    constraint=CONSTRAINT,
+                ),
+            ),
+        ),
+    ]
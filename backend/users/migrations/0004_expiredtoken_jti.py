@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:05
+
+from datetime import datetime, timezone
+
+import django.db.models.deletion
+import jwt
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_jti(apps, schema_editor):
+    ExpiredToken = apps.get_model('users', 'ExpiredToken')
+    for token in ExpiredToken.objects.all():
+        try:
+            payload = jwt.decode(
+                token.value, options={'verify_signature': False}
+            )
+            token.jti = payload['jti']
+            token.expires_at = datetime.fromtimestamp(
+                payload['exp'], tz=timezone.utc
+            )
+        except (jwt.PyJWTError, KeyError, TypeError, ValueError):
+            token.delete()
+            continue
+        if ExpiredToken.objects.filter(jti=token.jti).exists():
+            token.delete()
+            continue
+        token.save(update_fields=('jti', 'expires_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_unique_constraints'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expiredtoken',
+            name='jti',
+            field=models.CharField(help_text='Идентификатор отозванного токена. Такие токены больше не могут использоваться для аутентификации', max_length=255, null=True, verbose_name='Идентификатор токена'),
+        ),
+        migrations.AddField(
+            model_name='expiredtoken',
+            name='expires_at',
+            field=models.DateTimeField(help_text='Время истечения токена. После него запись об отзыве можно удалить', null=True, verbose_name='Истекает'),
+        ),
+        migrations.RunPython(fill_jti, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='expiredtoken',
+            name='value',
+        ),
+        migrations.AlterField(
+            model_name='expiredtoken',
+            name='jti',
+            field=models.CharField(help_text='Идентификатор отозванного токена. Такие токены больше не могут использоваться для аутентификации', max_length=255, unique=True, verbose_name='Идентификатор токена'),
+        ),
+        migrations.AlterField(
+            model_name='expiredtoken',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True, help_text='Время истечения токена. После него запись об отзыве можно удалить', verbose_name='Истекает'),
+        ),
+        migrations.AlterField(
+            model_name='expiredtoken',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='expired_tokens', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь'),
+        ),
+    ]
@@ -1,11 +1,52 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
 
 from users.constants import (HELP_TEXT, MAX_CHARFIELD_LENGTH,
-                             MAX_EMAILFIELD_LENGTH, MAX_SIZE_OF_JWT)
+                             MAX_EMAILFIELD_LENGTH, MAX_JTI_LENGTH)
 from users.validators import username_validator
 
 
+class CustomUserQuerySet(models.QuerySet):
+    def with_is_subscribed(self, user):
+        if user is None or user.is_anonymous:
+            return self.annotate(is_subscribed=models.Value(False))
+        return self.annotate(
+            is_subscribed=models.Exists(
+                Subscription.objects.filter(
+                    author=models.OuterRef('pk'),
+                    user=user
+                )
+            )
+        )
+
+    def subscriptions(self, user, recipes_limit=None):
+        from recipes.models import Recipe
+
+        recipes = Recipe.objects.all()
+        if recipes_limit is not None:
+            recipes = recipes[:recipes_limit]
+        return self.filter(
+            models.Exists(
+                Subscription.objects.filter(
+                    author=models.OuterRef('pk'),
+                    user=user
+                )
+            )
+        ).annotate(
+            is_subscribed=models.Value(True)
+        ).prefetch_related(
+            models.Prefetch(
+                'recipes',
+                queryset=recipes,
+                to_attr='limited_recipes'
+            )
+        ).order_by(*self.model._meta.ordering)
+
+
+class CustomUserManager(UserManager.from_queryset(CustomUserQuerySet)):
+    pass
+
+
 class CustomUser(AbstractUser):
     email = models.EmailField(
         verbose_name='Электронная почта',
@@ -33,11 +74,25 @@ class CustomUser(AbstractUser):
         help_text=HELP_TEXT.get('password'),
         max_length=MAX_CHARFIELD_LENGTH
     )
+    recipes_count = models.PositiveIntegerField(
+        verbose_name='Рецептов',
+        help_text=HELP_TEXT.get('recipes_count'),
+        default=0,
+        editable=False
+    )
+    subscribers_count = models.PositiveIntegerField(
+        verbose_name='Подписчиков',
+        help_text=HELP_TEXT.get('subscribers_count'),
+        default=0,
+        editable=False
+    )
 
     USERNAME_FIELD = 'email'
 
     REQUIRED_FIELDS = ('username', 'first_name', 'last_name')
 
+    objects = CustomUserManager()
+
     class Meta:
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
@@ -48,16 +103,24 @@ class CustomUser(AbstractUser):
 
 
 class ExpiredToken(models.Model):
-    value = models.CharField(
-        verbose_name='Значение',
-        help_text=HELP_TEXT.get('value'),
-        max_length=MAX_SIZE_OF_JWT
+    jti = models.CharField(
+        verbose_name='Идентификатор токена',
+        help_text=HELP_TEXT.get('jti'),
+        max_length=MAX_JTI_LENGTH,
+        unique=True
+    )
+
+    expires_at = models.DateTimeField(
+        verbose_name='Истекает',
+        help_text=HELP_TEXT.get('expires_at'),
+        db_index=True
     )
 
-    user = models.OneToOneField(
+    user = models.ForeignKey(
         verbose_name='Пользователь',
         to=CustomUser,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        related_name='expired_tokens'
     )
 
     class Meta:
@@ -66,7 +129,7 @@ class ExpiredToken(models.Model):
 
     def __str__(self) -> str:
         return (f'Истёкший токен пользователя {self.user}\n'
-                f'Значение токена: {self.value}')
+                f'Идентификатор токена: {self.jti}')
 
 
 class Subscription(models.Model):
@@ -87,6 +150,12 @@ class Subscription(models.Model):
     class Meta:
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'),
+                name='unique_subscription_user_author'
+            ),
+        )
 
     def __str__(self) -> str:
         return (f'Пользователь {self.user} подписался '
@@ -0,0 +1,39 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.constants import DENYLIST_REFRESH_INTERVAL
+from users.denylist import TokenDenylist
+from users.models import CustomUser
+
+
+class TokenDenylistTests(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email='user@foodgram.ru',
+            username='user',
+            first_name='Имя',
+            last_name='Фамилия',
+            password='Password123!'
+        )
+        self.token = AccessToken.for_user(self.user)
+        self.jti = self.token.get(api_settings.JTI_CLAIM)
+
+    def test_revocation_reaches_other_worker(self):
+        revoking_worker, checking_worker = TokenDenylist(), TokenDenylist()
+        self.assertFalse(checking_worker.is_revoked(self.jti))
+
+        revoking_worker.revoke(self.token, self.user)
+        cache.clear()
+
+        self.assertTrue(revoking_worker.is_revoked(self.jti))
+        with mock.patch(
+            'users.denylist.time.monotonic',
+            return_value=time.monotonic() + DENYLIST_REFRESH_INTERVAL
+        ):
+            self.assertTrue(checking_worker.is_revoked(self.jti))
@@ -5,9 +5,11 @@ from django.contrib.auth.decorators import login_required
 from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.views.decorators.http import require_GET, require_POST
 from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
 
 from api.serializers import CustomUserRetrieveSerializer, TokenLoginSerializer
-from users.models import ExpiredToken
+from users.denylist import token_denylist
 
 
 @login_required
@@ -92,15 +94,14 @@ def login_view(request: HttpRequest):
 
 @login_required
 def logout_view(request: HttpRequest):
-    auth_token = request.headers.get('Authorization').split(' ')[-1]
-    if auth_token is not None:
-        ExpiredToken.objects.create(
-            value=auth_token,
-            user=request.user
+    auth_token = request.headers.get('Authorization', '').split(' ')[-1]
+    try:
+        token = AccessToken(auth_token)
+    except TokenError:
+        return HttpResponse(
+            content='No token!',
+            status=400
         )
-        logout(request)
-        return HttpResponse('', status=204)
-    return HttpResponse(
-        content='No token!',
-        status=400
-    )
+    token_denylist.revoke(token, request.user)
+    logout(request)
+    return HttpResponse('', status=204)